@@ -36,7 +36,7 @@ echo.
 echo [2/4] Перезапуск бэкенда (порт 3000)...
 
 :: Backend
-ssh %SERVER_USER%@%SERVER_IP% "cd %SERVER_PATH%/backend && pkill -f 'uvicorn' || true && nohup python -m uvicorn main:app --host 0.0.0.0 --port 3000 > backend.log 2>&1 &"
+ssh %SERVER_USER%@%SERVER_IP% "cd %SERVER_PATH%/backend && python -m alembic upgrade head && { pkill -f 'uvicorn' || true; nohup python -m uvicorn main:app --host 0.0.0.0 --port 3000 > backend.log 2>&1 & }"
 
 echo.
 echo [3/4] Деплой лендинга (порт 3001)...
@@ -20,6 +20,19 @@ if %errorlevel% neq 0 (
 
 echo.
 echo ✅ Зависимости установлены!
+echo.
+echo 🗄️  Миграции БД...
+echo.
+
+alembic upgrade head
+
+if %errorlevel% neq 0 (
+    echo.
+    echo ❌ Ошибка при применении миграций!
+    pause
+    exit /b 1
+)
+
 echo.
 echo 🚀 Запуск FastAPI сервера...
 echo.
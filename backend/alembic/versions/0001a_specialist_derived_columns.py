@@ -0,0 +1,132 @@
+"""derived search, category, price, location and ranking columns on specialists
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001a"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trigram index on specialists.search_text
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("specialists", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("specialists", sa.Column("longitude", sa.Float(), nullable=True))
+    op.add_column("specialists", sa.Column("geohash", sa.String(length=12), nullable=True))
+    op.add_column("specialists", sa.Column("category_ids", postgresql.ARRAY(sa.String()), server_default="{}", nullable=False))
+    op.add_column("specialists", sa.Column("min_price", sa.Float(), nullable=True))
+    op.add_column("specialists", sa.Column("max_price", sa.Float(), nullable=True))
+    op.add_column("specialists", sa.Column("rank_score", sa.Float(), server_default="0", nullable=False))
+    op.add_column("specialists", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+    op.add_column("specialists", sa.Column("search_text", sa.Text(), nullable=True))
+
+    # Drop skills of deleted categories before adding the foreign key
+    op.execute("DELETE FROM skills WHERE category_id NOT IN (SELECT id FROM categories)")
+    op.create_foreign_key(
+        "skills_category_id_fkey", "skills", "categories", ["category_id"], ["id"], ondelete="CASCADE"
+    )
+
+    # Backfill existing specialists; the same statements as the refresh_*
+    # helpers in app.crud, frozen as of this revision
+    op.execute("""
+        UPDATE specialists s
+        SET category_ids = coalesce((
+            SELECT array_agg(m.category_id)
+            FROM (
+                SELECT category_id FROM services
+                WHERE specialist_id = s.id AND is_active = true
+                UNION
+                SELECT skills.category_id FROM skills
+                JOIN specialist_skills ON specialist_skills.skill_id = skills.id
+                WHERE specialist_skills.specialist_id = s.id
+            ) m
+        ), '{}'::varchar[])
+    """)
+    op.execute("""
+        UPDATE specialists s
+        SET min_price = p.min_price, max_price = p.max_price
+        FROM (
+            SELECT specialist_id, min(price) AS min_price, max(price) AS max_price
+            FROM services
+            WHERE is_active = true
+            GROUP BY specialist_id
+        ) p
+        WHERE s.id = p.specialist_id
+    """)
+    op.execute("""
+        UPDATE specialists s
+        SET search_vector =
+                setweight(to_tsvector('russian', coalesce(s.title, '')), 'A')
+                || setweight(to_tsvector('russian', coalesce(n.names, '')), 'B')
+                || setweight(to_tsvector('russian', coalesce(s.description, '')), 'C')
+                || setweight(to_tsvector('simple', coalesce(s.city, '')), 'D'),
+            search_text = lower(concat_ws(' ', s.title, n.names, s.city))
+        FROM (
+            SELECT specialists.id, string_agg(skills.name, ' ') AS names
+            FROM specialists
+            LEFT JOIN specialist_skills ON specialist_skills.specialist_id = specialists.id
+            LEFT JOIN skills ON skills.id = specialist_skills.skill_id
+            GROUP BY specialists.id
+        ) n
+        WHERE s.id = n.id
+    """)
+    op.execute("""
+        UPDATE specialists
+        SET rank_score =
+            0.6 * (4.0 * 10 + coalesce(rating, 0) * coalesce(review_count, 0))
+                / (10 + coalesce(review_count, 0)) / 5.0
+            + 0.15 * least(ln(1.0 + coalesce(completed_orders, 0)) / ln(501.0), 1.0)
+            + 0.1 * CASE WHEN is_verified THEN 1.0 ELSE 0.0 END
+            + 0.05 * CASE WHEN is_premium THEN 1.0 ELSE 0.0 END
+            + 0.1 / (1.0 + coalesce(response_time, 60) / 60.0)
+    """)
+
+    # Keyset pagination: (sort key, id) for every sort_by option
+    op.create_index("ix_specialists_rating_id", "specialists", ["rating", "id"])
+    op.create_index("ix_specialists_review_count_id", "specialists", ["review_count", "id"])
+    op.create_index("ix_specialists_experience_id", "specialists", ["experience", "id"])
+    op.create_index("ix_specialists_min_price_id", "specialists", ["min_price", "id"])
+    op.create_index("ix_specialists_rank_score_id", "specialists", ["rank_score", "id"])
+    op.create_index(op.f("ix_specialists_max_price"), "specialists", ["max_price"])
+    op.create_index("ix_specialists_search_vector", "specialists", ["search_vector"], postgresql_using="gin")
+    op.create_index(
+        "ix_specialists_search_text_trgm", "specialists", ["search_text"],
+        postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.create_index("ix_specialists_category_ids", "specialists", ["category_ids"], postgresql_using="gin")
+    op.create_index(
+        "ix_specialists_geohash", "specialists", ["geohash"],
+        postgresql_ops={"geohash": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_specialists_geohash", table_name="specialists")
+    op.drop_index("ix_specialists_category_ids", table_name="specialists")
+    op.drop_index("ix_specialists_search_text_trgm", table_name="specialists")
+    op.drop_index("ix_specialists_search_vector", table_name="specialists")
+    op.drop_index(op.f("ix_specialists_max_price"), table_name="specialists")
+    op.drop_index("ix_specialists_rank_score_id", table_name="specialists")
+    op.drop_index("ix_specialists_min_price_id", table_name="specialists")
+    op.drop_index("ix_specialists_experience_id", table_name="specialists")
+    op.drop_index("ix_specialists_review_count_id", table_name="specialists")
+    op.drop_index("ix_specialists_rating_id", table_name="specialists")
+    op.drop_constraint("skills_category_id_fkey", "skills", type_="foreignkey")
+    for column in (
+        "search_text", "search_vector", "rank_score", "max_price", "min_price",
+        "category_ids", "geohash", "longitude", "latitude",
+    ):
+        op.drop_column("specialists", column)
@@ -0,0 +1,36 @@
+"""unique skill per specialist
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep one row per (specialist, skill) before adding the constraint
+    op.execute("""
+        DELETE FROM specialist_skills a
+        USING specialist_skills b
+        WHERE a.specialist_id = b.specialist_id
+          AND a.skill_id = b.skill_id
+          AND a.id > b.id
+    """)
+    op.create_unique_constraint(
+        "uq_specialist_skills_specialist_skill", "specialist_skills", ["specialist_id", "skill_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_specialist_skills_specialist_skill", "specialist_skills", type_="unique")
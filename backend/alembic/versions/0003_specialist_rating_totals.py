@@ -0,0 +1,49 @@
+"""running rating totals on specialists
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("specialists", sa.Column("rating_sum", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("specialists", sa.Column("rating_count", sa.Integer(), server_default="0", nullable=False))
+    # Backfill from published reviews; rating and review_count are rebuilt
+    # from the same totals so that everything starts consistent
+    op.execute("""
+        UPDATE specialists s
+        SET rating_sum = totals.rating_sum,
+            rating_count = totals.rating_count,
+            review_count = totals.rating_count,
+            rating = round(totals.rating_sum::numeric / totals.rating_count, 2)
+        FROM (
+            SELECT specialist_id, sum(rating) AS rating_sum, count(*) AS rating_count
+            FROM reviews
+            WHERE is_published IS TRUE
+            GROUP BY specialist_id
+        ) totals
+        WHERE s.id = totals.specialist_id
+    """)
+    op.execute("""
+        UPDATE specialists
+        SET review_count = 0, rating = 0
+        WHERE rating_count = 0 AND (review_count <> 0 OR rating <> 0)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("specialists", "rating_count")
+    op.drop_column("specialists", "rating_sum")
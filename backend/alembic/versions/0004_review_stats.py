@@ -0,0 +1,67 @@
+"""review statistics per specialist
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('specialist_review_stats',
+    sa.Column('specialist_id', sa.String(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_2', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_3', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_4', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_5', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('responded', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['specialist_id'], ['specialists.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('specialist_id')
+    )
+    op.create_table('specialist_review_days',
+    sa.Column('specialist_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['specialist_id'], ['specialists.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('specialist_id', 'day')
+    )
+    # Backfill from published reviews
+    op.execute("""
+        INSERT INTO specialist_review_stats
+            (specialist_id, rating_1, rating_2, rating_3, rating_4, rating_5, responded)
+        SELECT specialist_id,
+               count(*) FILTER (WHERE rating = 1),
+               count(*) FILTER (WHERE rating = 2),
+               count(*) FILTER (WHERE rating = 3),
+               count(*) FILTER (WHERE rating = 4),
+               count(*) FILTER (WHERE rating = 5),
+               count(response)
+        FROM reviews
+        WHERE is_published IS TRUE
+        GROUP BY specialist_id
+    """)
+    op.execute("""
+        INSERT INTO specialist_review_days (specialist_id, day, rating_sum, rating_count)
+        SELECT specialist_id, created_at::date, sum(rating), count(*)
+        FROM reviews
+        WHERE is_published IS TRUE
+        GROUP BY specialist_id, created_at::date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('specialist_review_days')
+    op.drop_table('specialist_review_stats')
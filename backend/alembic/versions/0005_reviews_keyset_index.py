@@ -0,0 +1,30 @@
+"""keyset index for a specialist's reviews
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reviews_specialist_published_created_id",
+        "reviews",
+        ["specialist_id", "is_published", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reviews_specialist_published_created_id", table_name="reviews")
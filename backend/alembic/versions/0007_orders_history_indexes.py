@@ -0,0 +1,36 @@
+"""order history indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 20:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orders_client_status_created_id",
+        "orders",
+        ["client_id", "status", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_orders_specialist_status_created_id",
+        "orders",
+        ["specialist_id", "status", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_specialist_status_created_id", table_name="orders")
+    op.drop_index("ix_orders_client_status_created_id", table_name="orders")
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_db, pin_to_primary
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from app.core.security import get_password_hash, verify_password, create_access_token
@@ -34,6 +34,8 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    # No token yet, so get_db cannot pin the new user itself
+    pin_to_primary(user.id)
     
     # Create token
     access_token = create_access_token(data={"sub": user.id})
@@ -1,76 +1,33 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from typing import List
 
-from app.db.session import get_db
-from app.models.category import Category, Skill
-from app.schemas.category import CategoryResponse, SkillResponse
+from app.db.session import get_read_db
+from app.schemas.category import CategoryResponse
+from app.crud.category import get_category_tree, get_category_by_slug
 
 router = APIRouter()
 
 
+def _json_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("", response_model=List[CategoryResponse])
-async def get_categories(db: AsyncSession = Depends(get_db)):
-    query = select(Category).options(
-        selectinload(Category.skills)
-    ).where(Category.is_active == True).order_by(Category.order)
-    
-    result = await db.execute(query)
-    categories = result.scalars().all()
-    
-    return [
-        CategoryResponse(
-            id=c.id,
-            name=c.name,
-            slug=c.slug,
-            description=c.description,
-            icon=c.icon,
-            image=c.image,
-            order=c.order,
-            skills=[
-                SkillResponse(
-                    id=s.id,
-                    name=s.name,
-                    slug=s.slug,
-                    category_id=s.category_id
-                ) for s in c.skills
-            ]
-        ) for c in categories
-    ]
+async def get_categories(request: Request, db: AsyncSession = Depends(get_read_db)):
+    body, etag = await get_category_tree(db)
+    return _json_response(request, body, etag)
 
 
 @router.get("/{slug}", response_model=CategoryResponse)
-async def get_category(slug: str, db: AsyncSession = Depends(get_db)):
-    query = select(Category).options(
-        selectinload(Category.skills)
-    ).where(Category.slug == slug)
-    
-    result = await db.execute(query)
-    c = result.scalar_one_or_none()
+async def get_category(slug: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await get_category_by_slug(db, slug)
     
-    if not c:
+    if not entry:
         return None
     
-    return CategoryResponse(
-        id=c.id,
-        name=c.name,
-        slug=c.slug,
-        description=c.description,
-        icon=c.icon,
-        image=c.image,
-        order=c.order,
-        skills=[
-            SkillResponse(
-                id=s.id,
-                name=s.name,
-                slug=s.slug,
-                category_id=s.category_id
-            ) for s in c.skills
-        ]
-    )
-
-
-
-
+    return _json_response(request, *entry)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db, pool_stats
+from app.core.cache import cache_stats
+from app.core.security import get_current_user_id
+from app.crud.user import require_admin
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics(
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Pool and cache internals: admins only
+    await require_admin(db, user_id)
+    
+    # Per worker process: every worker has its own pool and caches
+    return {
+        "pools": pool_stats(),
+        "caches": cache_stats(),
+    }
@@ -1,69 +1,117 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from datetime import datetime, timezone
 from typing import List, Optional
 import uuid
 
-from app.db.session import get_db
-from app.models.order import Order, OrderStatus, PaymentStatus
+from app.db.session import get_db, get_read_db, stream_rows
+from app.models.order import Order, OrderStatus
 from app.models.service import Service
 from app.models.specialist import Specialist
 from app.schemas.order import OrderCreate, OrderResponse
 from app.core.security import get_current_user_id
 from app.core.config import settings
+from app.crud.order import order_history_query
+from app.crud.order_state import transition_order
+from app.crud.projections import ORDER
+from app.core.encoding import json_response, streaming_json_response
+from app.core.pagination import encode_cursor, decode_time_cursor
 
 router = APIRouter()
 
+DEFAULT_PER_PAGE = 20
+
+
+class OrderHistoryParams:
+    """Filters and paging shared by both order lists.
+    
+    Paging is opt-in: without page, per_page or cursor the whole history
+    is streamed, as the lists always returned it.
+    """
+    
+    def __init__(
+        self,
+        order_status: Optional[OrderStatus] = Query(None, alias="status"),
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        page: Optional[int] = Query(None, ge=1),
+        per_page: Optional[int] = Query(None, ge=1, le=100),
+        cursor: Optional[str] = None,
+    ):
+        self.status = order_status
+        self.created_from = _naive_utc(created_from)
+        self.created_to = _naive_utc(created_to)
+        self.page = page
+        self.per_page = per_page
+        self.cursor = cursor
+    
+    async def respond(self, db: AsyncSession, owner_column, owner_id: str):
+        if self.page is None and self.per_page is None and self.cursor is None:
+            # Full history can be large: stream it batch by batch
+            query = order_history_query(
+                owner_column, owner_id, self.status, self.created_from, self.created_to, limit=None,
+            )
+            return streaming_json_response(stream_rows(query), ORDER.to_dicts)
+        
+        # Keyset when a cursor is given, offset otherwise; one extra row
+        # tells whether there is a next page
+        per_page = self.per_page or DEFAULT_PER_PAGE
+        key = decode_time_cursor(self.cursor, "created_at") if self.cursor else None
+        query = order_history_query(
+            owner_column, owner_id, self.status, self.created_from, self.created_to,
+            key=key,
+            offset=0 if key else ((self.page or 1) - 1) * per_page,
+            limit=per_page + 1,
+        )
+        result = await db.execute(query)
+        items = ORDER.to_dicts(result.all())
+        
+        # The list stays a plain array; the next page's cursor goes in a header
+        headers = None
+        if len(items) > per_page:
+            items = items[:per_page]
+            headers = {"X-Next-Cursor": encode_cursor("created_at", [items[-1]["created_at"], items[-1]["id"]])}
+        
+        return json_response(items, headers=headers)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # orders.created_at is a naive UTC timestamp
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 @router.get("", response_model=List[OrderResponse])
 async def get_orders(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
-    status: Optional[OrderStatus] = None,
+    db: AsyncSession = Depends(get_read_db),
+    params: OrderHistoryParams = Depends(),
 ):
     # Get as client
-    query = select(Order).where(Order.client_id == user_id)
-    
-    if status:
-        query = query.where(Order.status == status)
-    
-    query = query.order_by(Order.created_at.desc())
-    
-    result = await db.execute(query)
-    orders = result.scalars().all()
-    
-    return [OrderResponse.model_validate(o) for o in orders]
+    return await params.respond(db, Order.client_id, user_id)
 
 
 @router.get("/specialist", response_model=List[OrderResponse])
 async def get_specialist_orders(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
-    status: Optional[OrderStatus] = None,
+    db: AsyncSession = Depends(get_read_db),
+    params: OrderHistoryParams = Depends(),
 ):
     # Get specialist
     result = await db.execute(
-        select(Specialist).where(Specialist.user_id == user_id)
+        select(Specialist.id).where(Specialist.user_id == user_id)
     )
-    specialist = result.scalar_one_or_none()
+    specialist_id = result.scalar_one_or_none()
     
-    if not specialist:
+    if not specialist_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Вы не являетесь специалистом"
         )
     
-    query = select(Order).where(Order.specialist_id == specialist.id)
-    
-    if status:
-        query = query.where(Order.status == status)
-    
-    query = query.order_by(Order.created_at.desc())
-    
-    result = await db.execute(query)
-    orders = result.scalars().all()
-    
-    return [OrderResponse.model_validate(o) for o in orders]
+    return await params.respond(db, Order.specialist_id, specialist_id)
 
 
 @router.post("", response_model=OrderResponse)
@@ -113,40 +161,7 @@ async def accept_order(
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    # Get specialist
-    result = await db.execute(
-        select(Specialist).where(Specialist.user_id == user_id)
-    )
-    specialist = result.scalar_one_or_none()
-    
-    if not specialist:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Вы не являетесь специалистом"
-        )
-    
-    # Get order
-    result = await db.execute(
-        select(Order).where(
-            Order.id == order_id,
-            Order.specialist_id == specialist.id
-        )
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Заказ не найден"
-        )
-    
-    if order.status != OrderStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Заказ уже обработан"
-        )
-    
-    order.status = OrderStatus.ACCEPTED
+    order = await transition_order(db, order_id, "accept", user_id)
     await db.commit()
     
     return {"success": True, "status": order.status.value}
@@ -158,38 +173,8 @@ async def complete_order(
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    # Get order
-    result = await db.execute(
-        select(Order).where(
-            Order.id == order_id,
-            Order.client_id == user_id
-        )
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Заказ не найден"
-        )
-    
-    if order.status not in [OrderStatus.ACCEPTED, OrderStatus.IN_PROGRESS]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Невозможно завершить заказ в текущем статусе"
-        )
-    
-    order.status = OrderStatus.COMPLETED
-    order.payment_status = PaymentStatus.RELEASED
-    
-    # Update specialist stats
-    result = await db.execute(
-        select(Specialist).where(Specialist.id == order.specialist_id)
-    )
-    specialist = result.scalar_one_or_none()
-    if specialist:
-        specialist.completed_orders += 1
-    
+    # Also releases the payment and counts the completion for the specialist
+    order = await transition_order(db, order_id, "complete", user_id)
     await db.commit()
     
     return {"success": True, "status": order.status.value}
@@ -201,33 +186,8 @@ async def cancel_order(
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    # Get order
-    result = await db.execute(
-        select(Order).where(
-            Order.id == order_id,
-            Order.client_id == user_id
-        )
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Заказ не найден"
-        )
-    
-    if order.status not in [OrderStatus.PENDING, OrderStatus.ACCEPTED]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Невозможно отменить заказ в текущем статусе"
-        )
-    
-    order.status = OrderStatus.CANCELLED
-    order.payment_status = PaymentStatus.REFUNDED
+    # Also refunds the payment
+    order = await transition_order(db, order_id, "cancel", user_id)
     await db.commit()
     
     return {"success": True, "status": order.status.value}
-
-
-
-
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.review import Review
 from app.models.order import Order, OrderStatus
 from app.models.specialist import Specialist
 from app.models.user import User
-from app.schemas.review import ReviewCreate, ReviewResponse
+from app.schemas.review import ReviewCreate, ReviewReply, ReviewResponse, ReviewStatsResponse
 from app.core.security import get_current_user_id
+from app.crud.review import count_review, get_review_stats, set_review_published, set_review_response
+from app.crud.user import require_admin
+from app.crud.projections import REVIEW, review_select
+from app.core.encoding import json_response
+from app.core.pagination import encode_cursor, decode_time_cursor, keyset_predicate
 
 router = APIRouter()
 
@@ -19,39 +24,51 @@ router = APIRouter()
 @router.get("/specialist/{specialist_id}", response_model=List[ReviewResponse])
 async def get_specialist_reviews(
     specialist_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    max_rating: Optional[int] = Query(None, ge=1, le=5),
 ):
-    query = select(Review).options(
-        selectinload(Review.user)
-    ).where(
+    # Walks ix_reviews_specialist_published_created_id newest first;
+    # rating filters are checked on the rows as they come
+    query = review_select().where(
         Review.specialist_id == specialist_id,
         Review.is_published == True
-    ).order_by(Review.created_at.desc())
+    ).order_by(Review.created_at.desc(), Review.id.desc())
     
-    query = query.offset((page - 1) * per_page).limit(per_page)
+    if min_rating is not None:
+        query = query.where(Review.rating >= min_rating)
+    if max_rating is not None:
+        query = query.where(Review.rating <= max_rating)
+    
+    # Pagination: keyset when a cursor is given, offset otherwise
+    if cursor:
+        key = decode_time_cursor(cursor, "created_at")
+        query = query.where(keyset_predicate(Review.created_at, Review.id, key))
+    else:
+        query = query.offset((page - 1) * per_page)
+    query = query.limit(per_page + 1)
     
     result = await db.execute(query)
-    reviews = result.scalars().all()
-    
-    return [
-        ReviewResponse(
-            id=r.id,
-            order_id=r.order_id,
-            user_id=r.user_id,
-            specialist_id=r.specialist_id,
-            rating=r.rating,
-            comment=r.comment,
-            pros=r.pros,
-            cons=r.cons,
-            response=r.response,
-            is_published=r.is_published,
-            created_at=r.created_at,
-            user_name=r.user.name if r.user else None,
-            user_avatar=r.user.avatar if r.user else None,
-        ) for r in reviews
-    ]
+    items = REVIEW.to_dicts(result.all())
+    
+    # The list stays a plain array; the next page's cursor goes in a header
+    headers = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        headers = {"X-Next-Cursor": encode_cursor("created_at", [items[-1]["created_at"], items[-1]["id"]])}
+    
+    return json_response(items, headers=headers)
+
+
+@router.get("/specialist/{specialist_id}/stats", response_model=ReviewStatsResponse)
+async def get_specialist_review_stats(
+    specialist_id: str,
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await get_review_stats(db, specialist_id)
 
 
 @router.post("", response_model=ReviewResponse)
@@ -108,25 +125,18 @@ async def create_review(
     )
     
     db.add(review)
-    
-    # Update specialist rating
-    result = await db.execute(
-        select(Specialist).where(Specialist.id == order.specialist_id)
-    )
-    specialist = result.scalar_one_or_none()
-    
-    if specialist:
-        # Calculate new average rating
-        result = await db.execute(
-            select(func.avg(Review.rating)).where(
-                Review.specialist_id == specialist.id,
-                Review.is_published == True
-            )
+    try:
+        await db.flush()
+    except IntegrityError:
+        # A concurrent request reviewed the same order first
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Отзыв на этот заказ уже оставлен"
         )
-        avg_rating = result.scalar() or data.rating
-        
-        specialist.rating = round(float(avg_rating), 2)
-        specialist.review_count += 1
+    
+    # Update specialist rating and review stats
+    await count_review(db, order.specialist_id, data.rating, func.current_date(), False, 1)
     
     await db.commit()
     await db.refresh(review)
@@ -148,5 +158,64 @@ async def create_review(
     )
 
 
+async def _set_published(db: AsyncSession, review_id: str, published: bool) -> dict:
+    result = await db.execute(select(Review.id).where(Review.id == review_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Отзыв не найден"
+        )
+    
+    changed = await set_review_published(db, review_id, published)
+    await db.commit()
+    
+    return {"success": True, "is_published": published, "changed": changed}
 
 
+@router.post("/{review_id}/unpublish")
+async def unpublish_review(
+    review_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    await require_admin(db, user_id)
+    return await _set_published(db, review_id, False)
+
+
+@router.post("/{review_id}/publish")
+async def publish_review(
+    review_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    await require_admin(db, user_id)
+    return await _set_published(db, review_id, True)
+
+
+@router.post("/{review_id}/response")
+async def respond_to_review(
+    review_id: str,
+    data: ReviewReply,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(Specialist.id).where(Specialist.user_id == user_id)
+    )
+    specialist_id = result.scalar_one_or_none()
+    
+    if not specialist_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Вы не являетесь специалистом"
+        )
+    
+    if not await set_review_response(db, review_id, specialist_id, data.response):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Отзыв не найден"
+        )
+    
+    await db.commit()
+    
+    return {"success": True}
@@ -4,11 +4,14 @@ from sqlalchemy import select
 from typing import List
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.service import Service
 from app.models.specialist import Specialist
 from app.schemas.service import ServiceCreate, ServiceResponse
 from app.core.security import get_current_user_id
+from app.crud.specialist import refresh_specialist_categories, refresh_specialist_prices
+from app.crud.projections import SERVICE
+from app.core.encoding import json_response
 
 router = APIRouter()
 
@@ -16,17 +19,16 @@ router = APIRouter()
 @router.get("/specialist/{specialist_id}", response_model=List[ServiceResponse])
 async def get_specialist_services(
     specialist_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Service).where(
+    query = SERVICE.select().where(
         Service.specialist_id == specialist_id,
         Service.is_active == True
     )
     
     result = await db.execute(query)
-    services = result.scalars().all()
     
-    return [ServiceResponse.model_validate(s) for s in services]
+    return json_response(SERVICE.to_dicts(result.all()))
 
 
 @router.post("", response_model=ServiceResponse)
@@ -59,6 +61,9 @@ async def create_service(
     )
     
     db.add(service)
+    await db.flush()
+    await refresh_specialist_categories(db, specialist.id)
+    await refresh_specialist_prices(db, specialist.id)
     await db.commit()
     await db.refresh(service)
     
@@ -99,6 +104,9 @@ async def delete_service(
         )
     
     await db.delete(service)
+    await db.flush()
+    await refresh_specialist_categories(db, specialist.id)
+    await refresh_specialist_prices(db, specialist.id)
     await db.commit()
     
     return {"success": True}
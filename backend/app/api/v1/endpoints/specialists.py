@@ -1,152 +1,249 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, or_, tuple_, cast, distinct, true, Integer
+from sqlalchemy.dialects.postgresql import array
 from typing import Optional
 import uuid
 
-from app.db.session import get_db
-from app.models.specialist import Specialist, SpecialistSkill
+from app.db.session import get_db, get_read_db, reads_own_writes
+from app.models.specialist import Specialist
+from app.models.category import Category
 from app.models.user import User, UserRole
-from app.schemas.specialist import SpecialistCreate, SpecialistResponse, SpecialistListResponse, SkillInfo
+from app.schemas.specialist import SpecialistCreate, SpecialistResponse, SpecialistListResponse, SpecialistFacetsResponse
 from app.core.security import get_current_user_id
+from app.core.pagination import encode_cursor, decode_cursor, keyset_predicate
+from app.core.geo import geohash_encode, covering_cells, distance_km
+from app.core.cache import MemoryCache, MISSING
+from app.core.encoding import json_response
+from app.core.config import settings
+from app.crud.search import refresh_search_document, search_filter, search_rank
+from app.crud.counting import count_rows
+from app.crud.profile import get_specialist_profile
+from app.crud.projections import SPECIALIST_LIST, specialist_list_select, load_skills
+from app.crud.ranking import refresh_rank_score
 
 router = APIRouter()
 
+# sort_by -> (column, descending)
+SORT_OPTIONS = {
+    "rating": (Specialist.rating, True),
+    "reviews": (Specialist.review_count, True),
+    "experience": (Specialist.experience, True),
+    "price": (Specialist.min_price, False),
+    "relevance": (Specialist.rank_score, True),
+}
+
+# normalized filters -> SpecialistFacetsResponse
+_facets_cache = MemoryCache(maxsize=2048, ttl=settings.FACETS_CACHE_TTL, name="facets")
+
+
+class SpecialistFilters:
+    """Listing filters shared by GET /specialists and GET /specialists/facets."""
+
+    def __init__(
+        self,
+        city: Optional[str] = None,
+        category: Optional[str] = None,
+        min_rating: Optional[float] = Query(None, ge=0, le=5),
+        verified_only: bool = False,
+        min_price: Optional[float] = Query(None, ge=0),
+        max_price: Optional[float] = Query(None, ge=0),
+        search: Optional[str] = Query(None, max_length=200),
+        lat: Optional[float] = Query(None, ge=-90, le=90),
+        lon: Optional[float] = Query(None, ge=-180, le=180),
+        radius_km: float = Query(10, gt=0, le=100),
+    ):
+        if (lat is None) != (lon is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Укажите обе координаты: lat и lon"
+            )
+        self.city = city
+        self.category = category
+        self.min_rating = min_rating
+        self.verified_only = verified_only
+        self.min_price = min_price
+        self.max_price = max_price
+        self.search = search.strip() if search else None
+        self.lat = lat
+        self.lon = lon
+        self.radius_km = radius_km
+        self.near = lat is not None and lon is not None
+        self.distance = distance_km(Specialist.latitude, Specialist.longitude, lat, lon) if self.near else None
+    
+    def apply(self, query):
+        if self.city:
+            query = query.where(Specialist.city == self.city)
+        if self.category:
+            category_id = select(Category.id).where(
+                or_(Category.id == self.category, Category.slug == self.category)
+            ).limit(1).scalar_subquery()
+            query = query.where(Specialist.category_ids.contains(array([category_id])))
+        if self.min_rating:
+            query = query.where(Specialist.rating >= self.min_rating)
+        if self.verified_only:
+            query = query.where(Specialist.is_verified == True)
+        # Price range: specialists whose price range overlaps the requested one
+        if self.min_price is not None:
+            query = query.where(Specialist.max_price >= self.min_price)
+        if self.max_price is not None:
+            query = query.where(Specialist.min_price <= self.max_price)
+        if self.search:
+            query = query.where(search_filter(self.search))
+        # Proximity: geohash prefix scans bound the rows, then exact distance
+        if self.near:
+            cells = covering_cells(self.lat, self.lon, self.radius_km)
+            query = query.where(
+                or_(*[Specialist.geohash.startswith(cell) for cell in cells]),
+                self.distance <= self.radius_km,
+            )
+        
+        # Only available
+        return query.where(Specialist.is_available == True)
+    
+    def cache_key(self) -> tuple:
+        return (
+            self.city, self.category, self.min_rating, self.verified_only,
+            self.min_price, self.max_price, self.search.lower() if self.search else None,
+            (self.lat, self.lon, self.radius_km) if self.near else None,
+        )
+
 
 @router.get("", response_model=SpecialistListResponse)
 async def get_specialists(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    filters: SpecialistFilters = Depends(),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    city: Optional[str] = None,
-    category: Optional[str] = None,
-    min_rating: Optional[float] = Query(None, ge=0, le=5),
-    verified_only: bool = False,
-    search: Optional[str] = None,
-    sort_by: str = Query("rating", regex="^(rating|reviews|experience|price)$"),
+    sort_by: Optional[str] = Query(None, regex="^(rating|reviews|experience|price|relevance|distance)$"),
+    cursor: Optional[str] = None,
+    count: str = Query("auto", regex="^(auto|exact|none)$"),
 ):
-    # Base query
-    query = select(Specialist).options(
-        selectinload(Specialist.user),
-        selectinload(Specialist.skills).selectinload(SpecialistSkill.skill)
-    )
+    if sort_by == "distance" and not filters.near:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Укажите обе координаты: lat и lon"
+        )
     
-    # Filters
-    if city:
-        query = query.where(Specialist.city == city)
-    if min_rating:
-        query = query.where(Specialist.rating >= min_rating)
-    if verified_only:
-        query = query.where(Specialist.is_verified == True)
-    if search:
-        query = query.where(Specialist.title.ilike(f"%{search}%"))
-    
-    # Only available
-    query = query.where(Specialist.is_available == True)
-    
-    # Sorting
-    if sort_by == "rating":
-        query = query.order_by(Specialist.rating.desc())
-    elif sort_by == "reviews":
-        query = query.order_by(Specialist.review_count.desc())
-    elif sort_by == "experience":
-        query = query.order_by(Specialist.experience.desc())
+    # Base query: plain columns with the user joined in, no ORM entities
+    query = filters.apply(specialist_list_select())
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    count_key = ("specialists",) + filters.cache_key()
+    total, total_is_estimate = await count_rows(db, query, count_key, count)
     
-    # Pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
+    # Sorting: explicit sort_by, else nearest first, relevance for searches,
+    # or rating. id breaks ties so that keyset pages are stable.
+    if sort_by is None:
+        sort_by = "distance" if filters.near else "search" if filters.search else "rating"
+    if sort_by == "distance":
+        sort_key, descending = filters.distance, False
+    elif sort_by == "search":
+        sort_key, descending = search_rank(filters.search), True
+    else:
+        sort_key, descending = SORT_OPTIONS[sort_by]
+    if filters.near:
+        query = query.add_columns(filters.distance)
+    query = query.add_columns(sort_key)
+    if descending:
+        query = query.order_by(sort_key.desc(), Specialist.id.desc())
+    else:
+        query = query.order_by(sort_key.asc(), Specialist.id.asc())
+    
+    # Pagination: keyset when a cursor is given, offset otherwise
+    if cursor:
+        key = decode_cursor(cursor, sort_by, 2)
+        query = query.where(keyset_predicate(sort_key, Specialist.id, key, descending))
+    else:
+        query = query.offset((page - 1) * per_page)
+    query = query.limit(per_page + 1)
     
     result = await db.execute(query)
-    specialists = result.scalars().all()
-    
-    items = []
-    for s in specialists:
-        item = SpecialistResponse(
-            id=s.id,
-            user_id=s.user_id,
-            title=s.title,
-            description=s.description,
-            city=s.city,
-            experience=s.experience,
-            rating=s.rating,
-            review_count=s.review_count,
-            completed_orders=s.completed_orders,
-            response_time=s.response_time,
-            is_verified=s.is_verified,
-            is_premium=s.is_premium,
-            is_available=s.is_available,
-            education=s.education,
-            created_at=s.created_at,
-            user_name=s.user.name if s.user else None,
-            user_avatar=s.user.avatar if s.user else None,
-            skills=[
-                SkillInfo(
-                    id=ss.skill.id,
-                    name=ss.skill.name,
-                    level=ss.level.value,
-                    years_exp=ss.years_exp
-                ) for ss in s.skills if ss.skill
-            ]
-        )
-        items.append(item)
-    
-    return SpecialistListResponse(
-        items=items,
-        total=total,
-        page=page,
-        per_page=per_page,
-        pages=(total + per_page - 1) // per_page
-    )
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_by, [last[-1], last[0]])
+    
+    items = SPECIALIST_LIST.to_dicts(rows)
+    skills = await load_skills(db, [item["id"] for item in items])
+    distance_index = len(SPECIALIST_LIST.names)
+    for item, row in zip(items, rows):
+        item["skills"] = skills.get(item["id"], [])
+        item["distance_km"] = round(row[distance_index], 3) if filters.near else None
+    
+    # Rows come straight from the database: encode without re-validation
+    return json_response({
+        "items": items,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+    })
 
 
-@router.get("/{specialist_id}", response_model=SpecialistResponse)
-async def get_specialist(specialist_id: str, db: AsyncSession = Depends(get_db)):
-    query = select(Specialist).options(
-        selectinload(Specialist.user),
-        selectinload(Specialist.skills).selectinload(SpecialistSkill.skill)
-    ).where(Specialist.id == specialist_id)
+@router.get("/facets", response_model=SpecialistFacetsResponse)
+async def get_specialist_facets(
+    db: AsyncSession = Depends(get_read_db),
+    filters: SpecialistFilters = Depends(),
+):
+    cache_key = filters.cache_key()
+    # A user who just wrote gets fresh facets, which then refresh the cache
+    if settings.FACETS_CACHE_TTL and not reads_own_writes(db):
+        cached = _facets_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+    
+    # One pass over the filtered rows; categories are unnested, so every
+    # facet counts distinct specialists.
+    category = func.unnest(Specialist.category_ids).table_valued("category_id").render_derived(name="cat").lateral()
+    rating_bucket = cast(func.floor(Specialist.rating), Integer)
+    dimensions = (Specialist.city, rating_bucket, Specialist.is_verified, category.c.category_id)
+    
+    query = filters.apply(
+        select(
+            func.grouping(*dimensions),
+            *dimensions,
+            func.count(distinct(Specialist.id)),
+        ).select_from(Specialist).outerjoin(category, true())
+    ).group_by(func.grouping_sets(*[tuple_(d) for d in dimensions], tuple_()))
     
     result = await db.execute(query)
-    s = result.scalar_one_or_none()
     
-    if not s:
+    facets = SpecialistFacetsResponse(total=0, cities={}, ratings={}, verified=0, categories={})
+    # grouping() has a bit set for every dimension the row is NOT grouped by
+    for grouping, city, rating, is_verified, category_id, n in result.all():
+        if grouping == 0b1111:
+            facets.total = n
+        elif grouping == 0b0111 and city is not None:
+            facets.cities[city] = n
+        elif grouping == 0b1011 and rating is not None:
+            facets.ratings[rating] = n
+        elif grouping == 0b1101 and is_verified:
+            facets.verified = n
+        elif grouping == 0b1110 and category_id is not None:
+            facets.categories[category_id] = n
+    
+    if settings.FACETS_CACHE_TTL:
+        _facets_cache.set(cache_key, facets)
+    return facets
+
+
+@router.get("/{specialist_id}", response_model=SpecialistResponse)
+async def get_specialist(specialist_id: str, db: AsyncSession = Depends(get_read_db)):
+    body = await get_specialist_profile(db, specialist_id)
+    
+    if body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Специалист не найден"
         )
     
-    return SpecialistResponse(
-        id=s.id,
-        user_id=s.user_id,
-        title=s.title,
-        description=s.description,
-        city=s.city,
-        experience=s.experience,
-        rating=s.rating,
-        review_count=s.review_count,
-        completed_orders=s.completed_orders,
-        response_time=s.response_time,
-        is_verified=s.is_verified,
-        is_premium=s.is_premium,
-        is_available=s.is_available,
-        education=s.education,
-        created_at=s.created_at,
-        user_name=s.user.name if s.user else None,
-        user_avatar=s.user.avatar if s.user else None,
-        skills=[
-            SkillInfo(
-                id=ss.skill.id,
-                name=ss.skill.name,
-                level=ss.level.value,
-                years_exp=ss.years_exp
-            ) for ss in s.skills if ss.skill
-        ]
-    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("", response_model=SpecialistResponse)
@@ -178,9 +275,16 @@ async def create_specialist(
         city=data.city,
         experience=data.experience,
         education=data.education,
+        latitude=data.latitude,
+        longitude=data.longitude,
     )
+    if data.latitude is not None and data.longitude is not None:
+        specialist.geohash = geohash_encode(data.latitude, data.longitude)
     
     db.add(specialist)
+    await db.flush()
+    await refresh_search_document(db, specialist.id)
+    await refresh_rank_score(db, specialist.id)
     await db.commit()
     await db.refresh(specialist)
     
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, specialists, categories, services, orders, reviews
+from app.api.v1.endpoints import auth, users, specialists, categories, services, orders, reviews, metrics
 
 api_router = APIRouter()
 
@@ -10,6 +10,7 @@ api_router.include_router(categories.router, prefix="/categories", tags=["Catego
 api_router.include_router(services.router, prefix="/services", tags=["Services"])
 api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
 api_router.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
 
 
 
@@ -0,0 +1,422 @@
+"""Bulk import of catalog and specialist data from CSV or JSON Lines.
+
+    python -m app.bulk_import --categories categories.csv --skills skills.csv \
+        --users users.jsonl --specialists specialists.csv \
+        --specialist-skills specialist_skills.csv --services services.csv
+
+Files are streamed in batches. Every batch is validated in one go, its
+references (emails, slugs) are resolved with one query each, and it is
+upserted with a multi-row INSERT ... ON CONFLICT in its own transaction,
+so re-running an import updates rows instead of duplicating them.
+Denormalized specialist columns are recomputed once at the end;
+`python -m app.bulk_import --refresh` recomputes them without importing.
+
+Caches of running API workers expire on their own TTLs.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import secrets
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, ValidationError
+from sqlalchemy import select, update, or_, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.geo import geohash_encode
+from app.core.security import get_password_hash
+from app.db.session import engine, AsyncSessionLocal
+from app.models.category import Category, Skill
+from app.models.service import Service
+from app.models.specialist import Specialist, SpecialistSkill, SkillLevel
+from app.models.user import User, UserRole
+from app.crud.category import invalidate_category_cache
+from app.crud.profile import profile_cache
+from app.crud.ranking import refresh_rank_score
+from app.crud.search import refresh_search_document
+from app.crud.specialist import refresh_specialist_categories, refresh_specialist_prices
+
+# Ids of imported rows without an explicit id are derived from their
+# natural key, so the same file imported twice maps to the same rows
+_ID_NAMESPACE = uuid.UUID("6f1c2d4e-8a7b-4c3d-9e0f-1a2b3c4d5e6f")
+
+# Postgres limit on bind parameters in one statement
+MAX_BIND_PARAMS = 32767
+
+
+def _stable_id(*parts: str) -> str:
+    return str(uuid.uuid5(_ID_NAMESPACE, "\x1f".join(parts)))
+
+
+# Input rows
+
+class CategoryRow(BaseModel):
+    id: Optional[str] = None
+    name: str
+    slug: str
+    description: Optional[str] = None
+    icon: Optional[str] = None
+    image: Optional[str] = None
+    order: int = 0
+    is_active: bool = True
+
+
+class SkillRow(BaseModel):
+    id: Optional[str] = None
+    name: str
+    slug: str
+    category: str  # id or slug
+
+
+class UserRow(BaseModel):
+    id: Optional[str] = None
+    email: EmailStr
+    name: str
+    phone: Optional[str] = None
+    avatar: Optional[str] = None
+    password_hash: Optional[str] = None
+    is_verified: bool = False
+
+
+class SpecialistRow(BaseModel):
+    user_email: EmailStr
+    title: str
+    description: str
+    city: str
+    address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    experience: int = Field(0, ge=0)
+    education: Optional[str] = None
+    work_schedule: Optional[str] = None
+    is_verified: bool = False
+
+
+class SpecialistSkillRow(BaseModel):
+    user_email: EmailStr
+    skill: str  # id or slug
+    level: SkillLevel = SkillLevel.INTERMEDIATE
+    years_exp: int = Field(0, ge=0)
+
+
+class ServiceRow(BaseModel):
+    id: Optional[str] = None
+    user_email: EmailStr
+    category: str  # id or slug
+    name: str
+    description: Optional[str] = None
+    price: float = Field(..., gt=0)
+    price_unit: str = "за услугу"
+    duration: Optional[int] = Field(None, gt=0)
+    is_active: bool = True
+
+
+# Reading
+
+def read_rows(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, raw row) from a .csv or .jsonl file."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Empty cells are missing values, not empty strings
+                yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+        else:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+
+
+def _batches(rows: Iterator, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(adapter: TypeAdapter, batch: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, BaseModel]], List[str]]:
+    """Validate a whole batch at once; invalid rows are dropped and reported."""
+    errors = []
+    try:
+        rows = adapter.validate_python([raw for _, raw in batch])
+        return list(zip([line for line, _ in batch], rows)), errors
+    except ValidationError as e:
+        bad = {}
+        for error in e.errors():
+            index = error["loc"][0]
+            field = ".".join(str(part) for part in error["loc"][1:])
+            bad.setdefault(index, []).append(f"{field}: {error['msg']}" if field else error["msg"])
+    for index, messages in bad.items():
+        errors.append(f"line {batch[index][0]}: " + "; ".join(messages))
+    good = [item for index, item in enumerate(batch) if index not in bad]
+    if not good:
+        return [], errors
+    return list(zip([line for line, _ in good], adapter.validate_python([raw for _, raw in good]))), errors
+
+
+# Reference lookups: one query per batch
+
+async def _ids_by_key(conn, model, keys) -> Dict[str, str]:
+    # id or slug -> id
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    result = await conn.execute(
+        select(model.id, model.slug).where(or_(model.id.in_(keys), model.slug.in_(keys)))
+    )
+    ids = {}
+    for id_, slug in result.all():
+        ids[id_] = id_
+        ids[slug] = id_
+    return ids
+
+
+async def _user_ids(conn, emails) -> Dict[str, str]:
+    result = await conn.execute(select(User.email, User.id).where(User.email.in_(set(emails))))
+    return dict(result.all())
+
+
+async def _specialist_ids(conn, emails) -> Dict[str, str]:
+    result = await conn.execute(
+        select(User.email, Specialist.id)
+        .join(Specialist, Specialist.user_id == User.id)
+        .where(User.email.in_(set(emails)))
+    )
+    return dict(result.all())
+
+
+# Per-entity row -> table values
+
+_shared_password_hash: Optional[str] = None
+
+
+def _unusable_password_hash() -> str:
+    # Imported accounts without a hash get one of a random secret: they
+    # sign in after a password reset. Hashed once per run, bcrypt is slow.
+    global _shared_password_hash
+    if _shared_password_hash is None:
+        _shared_password_hash = get_password_hash(secrets.token_urlsafe(32))
+    return _shared_password_hash
+
+
+async def _category_values(conn, rows):
+    return [
+        dict(r.model_dump(exclude={"id"}), id=r.id or _stable_id("category", r.slug))
+        for _, r in rows
+    ], []
+
+
+async def _skill_values(conn, rows):
+    categories = await _ids_by_key(conn, Category, [r.category for _, r in rows])
+    values, errors = [], []
+    for line, r in rows:
+        if r.category not in categories:
+            errors.append(f"line {line}: неизвестная категория {r.category!r}")
+            continue
+        values.append(dict(
+            id=r.id or _stable_id("skill", r.slug), name=r.name, slug=r.slug,
+            category_id=categories[r.category],
+        ))
+    return values, errors
+
+
+async def _user_values(conn, rows):
+    return [
+        dict(
+            r.model_dump(exclude={"id", "password_hash"}),
+            id=r.id or _stable_id("user", r.email),
+            password_hash=r.password_hash or _unusable_password_hash(),
+            role=UserRole.CLIENT,
+            is_active=True,
+        )
+        for _, r in rows
+    ], []
+
+
+async def _specialist_values(conn, rows):
+    users = await _user_ids(conn, [r.user_email for _, r in rows])
+    values, errors = [], []
+    for line, r in rows:
+        user_id = users.get(r.user_email)
+        if user_id is None:
+            errors.append(f"line {line}: пользователь {r.user_email} не найден")
+            continue
+        has_location = r.latitude is not None and r.longitude is not None
+        values.append(dict(
+            r.model_dump(exclude={"user_email"}),
+            id=_stable_id("specialist", user_id),
+            user_id=user_id,
+            geohash=geohash_encode(r.latitude, r.longitude) if has_location else None,
+        ))
+    return values, errors
+
+
+async def _specialist_skill_values(conn, rows):
+    specialists = await _specialist_ids(conn, [r.user_email for _, r in rows])
+    skills = await _ids_by_key(conn, Skill, [r.skill for _, r in rows])
+    values, errors = [], []
+    for line, r in rows:
+        specialist_id = specialists.get(r.user_email)
+        if specialist_id is None:
+            errors.append(f"line {line}: специалист {r.user_email} не найден")
+        elif r.skill not in skills:
+            errors.append(f"line {line}: неизвестный навык {r.skill!r}")
+        else:
+            values.append(dict(
+                id=_stable_id("specialist_skill", specialist_id, skills[r.skill]),
+                specialist_id=specialist_id, skill_id=skills[r.skill],
+                level=r.level, years_exp=r.years_exp,
+            ))
+    return values, errors
+
+
+async def _service_values(conn, rows):
+    specialists = await _specialist_ids(conn, [r.user_email for _, r in rows])
+    categories = await _ids_by_key(conn, Category, [r.category for _, r in rows])
+    values, errors = [], []
+    for line, r in rows:
+        specialist_id = specialists.get(r.user_email)
+        if specialist_id is None:
+            errors.append(f"line {line}: специалист {r.user_email} не найден")
+        elif r.category not in categories:
+            errors.append(f"line {line}: неизвестная категория {r.category!r}")
+        else:
+            values.append(dict(
+                r.model_dump(exclude={"id", "user_email", "category"}),
+                id=r.id or _stable_id("service", specialist_id, r.name),
+                specialist_id=specialist_id, category_id=categories[r.category],
+            ))
+    return values, errors
+
+
+class Entity:
+    def __init__(self, name: str, model, table, conflict: List[str], to_values: Callable, keep: Tuple[str, ...] = ()):
+        self.name = name
+        self.adapter = TypeAdapter(List[model])
+        self.table = table
+        self.conflict = conflict  # columns of the unique key to upsert on
+        self.to_values = to_values
+        self.keep = keep  # columns not overwritten when the row exists
+
+
+# In dependency order
+ENTITIES = [
+    Entity("categories", CategoryRow, Category.__table__, ["slug"], _category_values),
+    Entity("skills", SkillRow, Skill.__table__, ["slug"], _skill_values),
+    Entity("users", UserRow, User.__table__, ["email"], _user_values, keep=("password_hash", "role", "is_active")),
+    Entity("specialists", SpecialistRow, Specialist.__table__, ["user_id"], _specialist_values),
+    Entity("specialist_skills", SpecialistSkillRow, SpecialistSkill.__table__, ["specialist_id", "skill_id"], _specialist_skill_values),
+    Entity("services", ServiceRow, Service.__table__, ["id"], _service_values),
+]
+
+
+async def upsert(conn, entity: Entity, values: List[dict]) -> int:
+    # A key repeated within one INSERT ... ON CONFLICT DO UPDATE fails with
+    # "cannot affect row a second time": the last occurrence in the batch wins
+    unique = {tuple(v[c] for c in entity.conflict): v for v in values}
+    values = list(unique.values())
+    skip = set(entity.conflict) | {"id", "created_at"} | set(entity.keep)
+    # One multi-row VALUES statement per chunk, within the bind parameter
+    # limit; column defaults can add parameters beyond the given keys
+    rows_per_statement = MAX_BIND_PARAMS // len(entity.table.columns)
+    for start in range(0, len(values), rows_per_statement):
+        stmt = insert(entity.table).values(values[start:start + rows_per_statement])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=entity.conflict,
+            set_=dict(
+                {c: stmt.excluded[c] for c in values[0] if c not in skip},
+                updated_at=func.now(),
+            ),
+        )
+        await conn.execute(stmt)
+    return len(values)
+
+
+async def import_file(entity: Entity, path: Path, batch_size: int, report: Callable[[str], None]) -> Tuple[int, List[str]]:
+    imported, errors = 0, []
+    started = time.perf_counter()
+    for batch in _batches(read_rows(path), batch_size):
+        rows, batch_errors = validate_batch(entity.adapter, batch)
+        async with engine.begin() as conn:
+            values, lookup_errors = await entity.to_values(conn, rows)
+            if values:
+                imported += await upsert(conn, entity, values)
+                if entity.name == "specialists":
+                    # Same as POST /specialists: the account becomes a specialist
+                    await conn.execute(
+                        update(User)
+                        .where(User.id.in_([v["user_id"] for v in values]), User.role == UserRole.CLIENT)
+                        .values(role=UserRole.SPECIALIST)
+                    )
+        errors += batch_errors + lookup_errors
+        elapsed = time.perf_counter() - started
+        report(f"{entity.name}: {imported} imported, {len(errors)} skipped ({imported / elapsed:.0f} rows/s)")
+    return imported, errors
+
+
+async def refresh_denormalized() -> None:
+    """Recompute every derived specialist column once, after the import."""
+    async with AsyncSessionLocal() as db:
+        await refresh_specialist_categories(db)
+        await refresh_specialist_prices(db)
+        await refresh_search_document(db)
+        await refresh_rank_score(db)
+        await db.commit()
+    invalidate_category_cache()
+    profile_cache.clear()
+
+
+async def run(files: Dict[str, Path], batch_size: int, report: Callable[[str], None] = print, refresh: bool = False) -> int:
+    skipped = 0
+    try:
+        for entity in ENTITIES:
+            path = files.get(entity.name)
+            if path is None:
+                continue
+            imported, errors = await import_file(entity, path, batch_size, report)
+            for error in errors[:20]:
+                report(f"  {path.name} {error}")
+            if len(errors) > 20:
+                report(f"  ... and {len(errors) - 20} more")
+            skipped += len(errors)
+
+        if refresh or set(files) - {"categories", "users"}:
+            t = time.perf_counter()
+            await refresh_denormalized()
+            report(f"denormalized columns recomputed in {time.perf_counter() - t:.1f} s")
+    finally:
+        await engine.dispose()
+    return skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import from CSV or JSON Lines (.csv / .jsonl)")
+    for entity in ENTITIES:
+        parser.add_argument("--" + entity.name.replace("_", "-"), type=Path, metavar="FILE")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="recompute derived specialist columns (search, categories, prices, rank) even without files",
+    )
+    args = parser.parse_args()
+
+    files = {e.name: getattr(args, e.name) for e in ENTITIES if getattr(args, e.name) is not None}
+    if not files and not args.refresh:
+        parser.error("nothing to import")
+
+    report = lambda line: print(line, file=sys.stderr, flush=True)
+    skipped = asyncio.run(run(files, args.batch_size, report, refresh=args.refresh))
+    sys.exit(1 if skipped else 0)
+
+
+if __name__ == "__main__":
+    main()
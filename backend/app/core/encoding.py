@@ -0,0 +1,45 @@
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Iterable, List
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj: Any):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def json_response(data: Any, status_code: int = 200, headers: dict = None) -> Response:
+    """Encode trusted data as-is, skipping response_model validation."""
+    return Response(content=dumps(data), status_code=status_code, media_type="application/json", headers=headers)
+
+
+async def json_array_stream(batches: AsyncIterator[List], to_dicts: Callable[[Iterable], List[dict]]) -> AsyncIterator[bytes]:
+    # One chunk per batch; only the current batch is held in memory
+    yield b"["
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        chunk = dumps(to_dicts(batch))[1:-1]
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+
+def streaming_json_response(batches: AsyncIterator[List], to_dicts: Callable[[Iterable], List[dict]]) -> StreamingResponse:
+    return StreamingResponse(json_array_stream(batches, to_dicts), media_type="application/json")
@@ -0,0 +1,73 @@
+import math
+from typing import List, Tuple
+
+from sqlalchemy import Float, func
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_PRECISION = 9  # ~5 m cells; stored precision
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        ch <<= 1
+        if value >= mid:
+            ch |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    # (height, width) of a cell in degrees
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(lat: float, lon: float, radius_km: float) -> List[str]:
+    """Geohash prefixes whose union covers the circle around (lat, lon).
+
+    Picks the finest precision whose cells are at least radius_km in both
+    directions, so the cell of the centre plus its 8 neighbours suffice.
+    """
+    km_per_deg = math.pi * EARTH_RADIUS_KM / 180
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        height, width = _cell_size(p)
+        width_km = width * km_per_deg * math.cos(math.radians(min(abs(lat) + height, 90.0)))
+        if height * km_per_deg >= radius_km and width_km >= radius_km:
+            precision = p
+            break
+
+    height, width = _cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            cell_lat = max(-90.0, min(90.0, lat + dlat))
+            cell_lon = (lon + dlon + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(cell_lat, cell_lon, precision))
+    return sorted(cells)
+
+
+def distance_km(lat_column, lon_column, lat: float, lon: float):
+    """Haversine distance in km between columns and a point, as SQL."""
+    dlat = func.radians(lat_column - lat, type_=Float)
+    dlon = func.radians(lon_column - lon, type_=Float)
+    a = (
+        func.power(func.sin(dlat / 2.0, type_=Float), 2, type_=Float)
+        + math.cos(math.radians(lat))
+        * func.cos(func.radians(lat_column, type_=Float), type_=Float)
+        * func.power(func.sin(dlon / 2.0, type_=Float), 2, type_=Float)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(1.0, a, type_=Float), type_=Float), type_=Float)
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+
+
+def encode_cursor(sort_by: str, values: List[Any]) -> str:
+    payload = json.dumps({"s": sort_by, "k": values}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        if payload["s"] != sort_by or not isinstance(values, list) or len(values) != size:
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+    return values
+
+
+def decode_time_cursor(cursor: str, sort_by: str) -> List[Any]:
+    # (timestamp, id) keys: the timestamp travels as an ISO string
+    value, last_id = decode_cursor(cursor, sort_by, 2)
+    try:
+        return [datetime.fromisoformat(value), last_id]
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+
+
+def keyset_predicate(sort_key, id_column, key: List[Any], descending: bool = True):
+    # Rows strictly after key in (sort_key, id) order. Postgres sorts NULL
+    # as the largest value: first when descending, last when ascending.
+    value, last_id = key
+    if descending:
+        if value is None:
+            return or_(sort_key.is_not(None), id_column < last_id)
+        return tuple_(sort_key, id_column) < tuple_(value, last_id)
+    if value is None:
+        return and_(sort_key.is_(None), id_column > last_id)
+    return or_(tuple_(sort_key, id_column) > tuple_(value, last_id), sort_key.is_(None))
@@ -9,6 +9,7 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -59,5 +60,11 @@ async def get_current_user_id(
     return user_id
 
 
-
-
+async def get_optional_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[str]:
+    # Anonymous or invalid token: None, no error
+    if credentials is None:
+        return None
+    payload = decode_token(credentials.credentials)
+    return payload.get("sub") if payload else None
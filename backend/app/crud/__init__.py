@@ -0,0 +1 @@
+# CRUD helpers
@@ -0,0 +1,115 @@
+import hashlib
+import time
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import MemoryCache, MISSING
+from app.core.config import settings
+from app.db.session import may_lag
+from app.models.category import Category, Skill
+from app.schemas.category import CategoryResponse, SkillResponse
+
+# key -> (json bytes, etag); entries hold the serialized response body
+_cache = MemoryCache(maxsize=512, ttl=settings.CATEGORY_CACHE_TTL, name="categories")
+_generation = 0
+_changed_at: Optional[float] = None  # monotonic time of the last invalidation
+
+_category_list = TypeAdapter(List[CategoryResponse])
+
+
+def invalidate_category_cache() -> None:
+    global _generation, _changed_at
+    _generation += 1
+    _changed_at = time.monotonic()
+    _cache.clear()
+
+
+def _to_response(c: Category) -> CategoryResponse:
+    return CategoryResponse(
+        id=c.id,
+        name=c.name,
+        slug=c.slug,
+        description=c.description,
+        icon=c.icon,
+        image=c.image,
+        order=c.order,
+        skills=[
+            SkillResponse(
+                id=s.id,
+                name=s.name,
+                slug=s.slug,
+                category_id=s.category_id
+            ) for s in c.skills
+        ]
+    )
+
+
+def _entry(body: bytes) -> Tuple[bytes, str]:
+    return body, '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+async def get_category_tree(db: AsyncSession) -> Tuple[bytes, str]:
+    cached = _cache.get("tree")
+    if cached is not MISSING:
+        return cached
+
+    generation = _generation
+    query = select(Category).options(
+        selectinload(Category.skills)
+    ).where(Category.is_active == True).order_by(Category.order)
+
+    result = await db.execute(query)
+    categories = result.scalars().all()
+
+    entry = _entry(_category_list.dump_json([_to_response(c) for c in categories]))
+    # Don't cache data read while a write was being committed, or from a
+    # replica that may not have it yet
+    if generation == _generation and not may_lag(db, _changed_at):
+        _cache.set("tree", entry)
+    return entry
+
+
+async def get_category_by_slug(db: AsyncSession, slug: str) -> Optional[Tuple[bytes, str]]:
+    key = ("slug", slug)
+    cached = _cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    generation = _generation
+    query = select(Category).options(
+        selectinload(Category.skills)
+    ).where(Category.slug == slug)
+
+    result = await db.execute(query)
+    c = result.scalar_one_or_none()
+    if not c:
+        return None
+
+    entry = _entry(_to_response(c).model_dump_json().encode())
+    if generation == _generation and not may_lag(db, _changed_at):
+        _cache.set(key, entry)
+    return entry
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Category, Skill)):
+            session.info["catalog_changed"] = True
+            invalidate_category_cache()
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("catalog_changed", False):
+        invalidate_category_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop("catalog_changed", None)
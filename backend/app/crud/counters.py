@@ -0,0 +1,165 @@
+"""Specialist counters that many requests bump at once.
+
+Writers append a row to specialist_counter_deltas instead of updating
+the specialist, so concurrent completions neither lose updates nor queue
+on the specialist's row lock. fold_counter_deltas moves pending deltas
+into specialists in batches; reconcile_counters recomputes the counters
+from orders and reviews and repairs any drift.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, case, cast, func, or_, Numeric
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.order import Order, OrderStatus
+from app.models.review import Review
+from app.models.specialist import Specialist, SpecialistCounterDelta
+from app.crud.profile import mark_profile_changed
+from app.crud.ranking import rank_score_expression
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key: one fold or reconciliation at a time across workers
+COUNTER_LOCK_KEY = 7_401_253
+
+
+def record_completed_order(db: AsyncSession, specialist_id: str) -> None:
+    db.add(SpecialistCounterDelta(specialist_id=specialist_id, completed_orders=1))
+
+
+async def _lock(db: AsyncSession) -> bool:
+    return bool(await db.scalar(select(func.pg_try_advisory_xact_lock(COUNTER_LOCK_KEY))))
+
+
+async def _refresh_ranks(db: AsyncSession, specialist_ids: List[str]) -> None:
+    await db.execute(
+        update(Specialist)
+        .where(Specialist.id.in_(specialist_ids))
+        .values(rank_score=rank_score_expression())
+        .execution_options(synchronize_session=False)
+    )
+    mark_profile_changed(db, specialist_ids)
+
+
+async def fold_counter_deltas(db: AsyncSession, limit: Optional[int] = None) -> List[str]:
+    """Move up to limit pending deltas into specialists. Returns the specialists touched.
+
+    The deltas are deleted and applied in one statement, so each counts
+    exactly once even if several workers fold at the same time.
+    """
+    batch = select(SpecialistCounterDelta.id).order_by(SpecialistCounterDelta.id).limit(limit)
+    folded = (
+        delete(SpecialistCounterDelta)
+        .where(SpecialistCounterDelta.id.in_(batch.scalar_subquery()))
+        .returning(SpecialistCounterDelta.specialist_id, SpecialistCounterDelta.completed_orders)
+        .cte("folded")
+    )
+    totals = (
+        select(folded.c.specialist_id, func.sum(folded.c.completed_orders).label("completed_orders"))
+        .group_by(folded.c.specialist_id)
+        .cte("totals")
+    )
+    stmt = (
+        update(Specialist)
+        .where(Specialist.id == totals.c.specialist_id)
+        .values(completed_orders=func.coalesce(Specialist.completed_orders, 0) + totals.c.completed_orders)
+        .returning(Specialist.id)
+    )
+    result = await db.execute(stmt.execution_options(synchronize_session=False))
+    specialist_ids = list(result.scalars())
+    if specialist_ids:
+        await _refresh_ranks(db, specialist_ids)
+    return specialist_ids
+
+
+async def reconcile_counters(db: AsyncSession) -> List[str]:
+    """Recompute the counters from orders and reviews; returns the specialists that drifted.
+
+    Run in a REPEATABLE READ transaction: pending deltas are folded first,
+    and both the fold and the recount see the same snapshot, so a
+    completion that commits meanwhile is counted later, not twice.
+    """
+    await fold_counter_deltas(db)
+
+    completed = (
+        select(func.count())
+        .where(Order.specialist_id == Specialist.id, Order.status == OrderStatus.COMPLETED)
+        .scalar_subquery()
+    )
+    published = [Review.specialist_id == Specialist.id, Review.is_published.is_(True)]
+    rating_sum = select(func.coalesce(func.sum(Review.rating), 0)).where(*published).scalar_subquery()
+    rating_count = select(func.count()).where(*published).scalar_subquery()
+
+    stmt = (
+        update(Specialist)
+        .where(or_(
+            Specialist.completed_orders.is_distinct_from(completed),
+            Specialist.rating_sum != rating_sum,
+            Specialist.rating_count != rating_count,
+        ))
+        .values(
+            completed_orders=completed,
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            review_count=rating_count,
+            rating=case(
+                (rating_count > 0, func.round(cast(rating_sum, Numeric) / rating_count, 2)),
+                else_=0.0,
+            ),
+        )
+        .returning(Specialist.id)
+    )
+    result = await db.execute(stmt.execution_options(synchronize_session=False))
+    specialist_ids = list(result.scalars())
+    if specialist_ids:
+        await _refresh_ranks(db, specialist_ids)
+    return specialist_ids
+
+
+async def run_fold() -> int:
+    async with AsyncSessionLocal() as db:
+        if not await _lock(db):
+            return 0
+        specialist_ids = await fold_counter_deltas(db, settings.COUNTER_FOLD_BATCH)
+        await db.commit()
+    return len(specialist_ids)
+
+
+async def run_reconciliation() -> int:
+    async with AsyncSessionLocal() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        if not await _lock(db):
+            return 0
+        try:
+            specialist_ids = await reconcile_counters(db)
+            await db.commit()
+        except DBAPIError as e:
+            # A specialist row changed under the snapshot; the next run retries
+            await db.rollback()
+            logger.warning("Counter reconciliation aborted: %s", e.orig)
+            return 0
+    if specialist_ids:
+        logger.warning("Counter reconciliation repaired %d specialists", len(specialist_ids))
+    return len(specialist_ids)
+
+
+async def run_counter_jobs() -> None:
+    """Background loop: fold deltas often, reconcile rarely."""
+    loop = asyncio.get_running_loop()
+    next_reconcile = loop.time() + settings.COUNTER_RECONCILE_INTERVAL
+    while True:
+        try:
+            # Drain a backlog without sleeping between batches
+            while await run_fold():
+                pass
+            if settings.COUNTER_RECONCILE_INTERVAL and loop.time() >= next_reconcile:
+                next_reconcile = loop.time() + settings.COUNTER_RECONCILE_INTERVAL
+                await run_reconciliation()
+        except Exception:
+            logger.exception("Counter job failed")
+        await asyncio.sleep(settings.COUNTER_FOLD_INTERVAL)
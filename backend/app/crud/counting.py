@@ -0,0 +1,65 @@
+import json
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.cache import MemoryCache, MISSING
+from app.core.config import settings
+from app.db.session import reads_own_writes
+
+# normalized filter key -> (total, is_estimate)
+_count_cache = MemoryCache(maxsize=4096, ttl=settings.COUNT_CACHE_TTL, name="counts")
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db: AsyncSession, query) -> int:
+    result = await db.execute(_Explain(query))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    db: AsyncSession,
+    query,
+    cache_key: Hashable,
+    mode: str = "auto",
+) -> Tuple[Optional[int], bool]:
+    """Return (total, is_estimate) for a filtered select.
+
+    mode "none" skips counting, "exact" always counts (cached), and "auto"
+    trusts the planner estimate once it is above COUNT_ESTIMATE_THRESHOLD.
+    """
+    if mode == "none":
+        return None, False
+
+    # A user who just wrote counts afresh, then refreshes the cached total
+    cached = MISSING if reads_own_writes(db) else _count_cache.get(cache_key)
+    if cached is not MISSING and (mode == "auto" or not cached[1]):
+        return cached
+
+    if mode == "auto":
+        estimate = await estimate_rows(db, query)
+        if estimate > settings.COUNT_ESTIMATE_THRESHOLD:
+            _count_cache.set(cache_key, (estimate, True))
+            return estimate, True
+
+    result = await db.execute(select(func.count()).select_from(query.subquery()))
+    total = result.scalar() or 0
+    _count_cache.set(cache_key, (total, False))
+    return total, False
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import select, union_all
+
+from app.models.order import Order, OrderStatus
+from app.core.pagination import keyset_predicate
+from app.crud.projections import ORDER
+
+
+def order_history_query(
+    owner_column,
+    owner_id: str,
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    key: Optional[List[Any]] = None,
+    offset: int = 0,
+    limit: Optional[int] = 20,
+):
+    """A page of one user's orders, newest first, as ORDER rows.
+
+    owner_column is Order.client_id or Order.specialist_id; both lead an
+    (owner, status, created_at, id) index. Without a status filter, each
+    status is read as its own short index range and the ranges are merged,
+    so the cost depends on the page size, not on the length of the history.
+    key is the (created_at, id) of the last row of the previous page;
+    limit=None selects the whole history.
+    """
+    def branch(order_status: OrderStatus):
+        query = ORDER.select().where(owner_column == owner_id, Order.status == order_status)
+        if created_from is not None:
+            query = query.where(Order.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Order.created_at < created_to)
+        if key is not None:
+            query = query.where(keyset_predicate(Order.created_at, Order.id, key))
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        return query.limit(offset + limit) if limit is not None else query
+
+    if status is not None:
+        query = branch(status)
+    else:
+        merged = union_all(*[branch(s) for s in OrderStatus]).subquery()
+        query = (
+            select(*[merged.c[name] for name in ORDER.names])
+            .order_by(merged.c.created_at.desc(), merged.c.id.desc())
+        )
+    return query.offset(offset).limit(limit) if limit is not None else query
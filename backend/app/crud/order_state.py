@@ -0,0 +1,99 @@
+"""Order status transitions.
+
+Every transition is a single conditional UPDATE ... RETURNING: the status
+check and the change happen in one statement, so of two racing requests
+(accept and cancel, say) only one can move the order out of a given
+status. The rows that lost are told why by a second query that only runs
+on failure.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, func
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.specialist import Specialist
+from app.crud.counters import record_completed_order
+
+
+class Transition(NamedTuple):
+    sources: Tuple[OrderStatus, ...]
+    target: OrderStatus
+    by_specialist: bool  # performed by the order's specialist, else by its client
+    payment_status: Optional[PaymentStatus]
+    error: str  # when the order is not in one of the sources
+
+
+TRANSITIONS: Dict[str, Transition] = {
+    "accept": Transition(
+        (OrderStatus.PENDING,), OrderStatus.ACCEPTED, True, None,
+        "Заказ уже обработан",
+    ),
+    "complete": Transition(
+        (OrderStatus.ACCEPTED, OrderStatus.IN_PROGRESS), OrderStatus.COMPLETED, False, PaymentStatus.RELEASED,
+        "Невозможно завершить заказ в текущем статусе",
+    ),
+    "cancel": Transition(
+        (OrderStatus.PENDING, OrderStatus.ACCEPTED), OrderStatus.CANCELLED, False, PaymentStatus.REFUNDED,
+        "Невозможно отменить заказ в текущем статусе",
+    ),
+}
+
+
+def _owned_by(transition: Transition, user_id: str):
+    if transition.by_specialist:
+        return Order.specialist_id == select(Specialist.id).where(Specialist.user_id == user_id).scalar_subquery()
+    return Order.client_id == user_id
+
+
+async def transition_order(db: AsyncSession, order_id: str, name: str, user_id: str) -> Row:
+    """Apply TRANSITIONS[name] to the user's order and return (id, specialist_id, status, payment_status).
+
+    Raises 403/404/400 HTTPExceptions when the transition is not allowed.
+    Side effects are queued in the same transaction; the caller commits.
+    """
+    transition = TRANSITIONS[name]
+    values = {"status": transition.target}
+    if transition.payment_status is not None:
+        values["payment_status"] = transition.payment_status
+    if transition.target == OrderStatus.COMPLETED:
+        values["completed_at"] = func.now()
+
+    stmt = (
+        update(Order)
+        .where(
+            Order.id == order_id,
+            _owned_by(transition, user_id),
+            Order.status.in_(transition.sources),
+        )
+        .values(**values)
+        .returning(Order.id, Order.specialist_id, Order.status, Order.payment_status)
+    )
+    row = (await db.execute(stmt.execution_options(synchronize_session=False))).first()
+    if row is not None:
+        if transition.target == OrderStatus.COMPLETED:
+            record_completed_order(db, row.specialist_id)
+        return row
+
+    # Why it failed: not the user's order, or not in a source status
+    result = await db.execute(
+        select(Order.status).where(Order.id == order_id, _owned_by(transition, user_id))
+    )
+    if result.scalar_one_or_none() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=transition.error
+        )
+    if transition.by_specialist:
+        result = await db.execute(select(Specialist.id).where(Specialist.user_id == user_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Вы не являетесь специалистом"
+            )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Заказ не найден"
+    )
@@ -0,0 +1,173 @@
+"""Serialized specialist profiles, cached per worker process.
+
+Entries are keyed by (specialist_id, version). Writes bump the version
+when they flush and again when they commit, so readers move on to a new
+key instead of racing a delete. Invalidation is per process: the bump
+only reaches this worker's cache. Other workers keep serving their copy
+until PROFILE_CACHE_TTL expires it, which bounds staleness across
+workers.
+
+A replica may still return the old row right after a bump. Such loads
+are served but not stored, so the new version's entry comes from the
+primary, or from a replica once READ_YOUR_WRITES_WINDOW has passed.
+"""
+import itertools
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import MemoryCache, MISSING
+from app.core.config import settings
+from app.db.session import may_lag
+from app.models.specialist import Specialist, SpecialistSkill
+from app.models.user import User
+from app.schemas.specialist import SpecialistResponse, SkillInfo
+
+# (specialist_id, version) -> serialized SpecialistResponse
+profile_cache = MemoryCache(
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL,
+    max_bytes=settings.PROFILE_CACHE_MAX_BYTES,
+    name="profiles",
+)
+# specialist_id -> (current version, monotonic time of the bump), for
+# specialists written since startup.
+# Bounded like the cache: an id that falls out reads as version 0 again,
+# and versions come from one counter so a later bump never reuses a key
+# an old entry may still sit under.
+_versions = MemoryCache(maxsize=settings.PROFILE_CACHE_SIZE)
+_version_counter = itertools.count(1)
+# user_id -> specialist_id for cached profiles, so user edits bump them
+_profile_users = MemoryCache(maxsize=settings.PROFILE_CACHE_SIZE)
+
+
+def bump_profile_version(specialist_id: str) -> None:
+    version, _ = _versions.get(specialist_id, (0, None))
+    profile_cache.delete((specialist_id, version))
+    _versions.set(specialist_id, (next(_version_counter), time.monotonic()))
+
+
+def mark_profile_changed(db: AsyncSession, specialist_ids: Iterable[str]) -> None:
+    """Invalidate profiles now and again once the transaction commits.
+
+    ORM changes are picked up automatically; call this after core UPDATEs.
+    """
+    pending = db.sync_session.info.setdefault("changed_profiles", set())
+    for specialist_id in specialist_ids:
+        pending.add(specialist_id)
+        bump_profile_version(specialist_id)
+
+
+def specialist_to_response(s: Specialist) -> SpecialistResponse:
+    return SpecialistResponse(
+        id=s.id,
+        user_id=s.user_id,
+        title=s.title,
+        description=s.description,
+        city=s.city,
+        experience=s.experience,
+        rating=s.rating,
+        review_count=s.review_count,
+        completed_orders=s.completed_orders,
+        response_time=s.response_time,
+        is_verified=s.is_verified,
+        is_premium=s.is_premium,
+        is_available=s.is_available,
+        education=s.education,
+        min_price=s.min_price,
+        max_price=s.max_price,
+        created_at=s.created_at,
+        user_name=s.user.name if s.user else None,
+        user_avatar=s.user.avatar if s.user else None,
+        skills=[
+            SkillInfo(
+                id=ss.skill.id,
+                name=ss.skill.name,
+                level=ss.level.value,
+                years_exp=ss.years_exp
+            ) for ss in s.skills if ss.skill
+        ]
+    )
+
+
+async def get_specialist_profile(db: AsyncSession, specialist_id: str) -> Optional[bytes]:
+    version, bumped_at = _versions.get(specialist_id, (0, None))
+    key = (specialist_id, version)
+    cached = profile_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    query = select(Specialist).options(
+        selectinload(Specialist.user),
+        selectinload(Specialist.skills).selectinload(SpecialistSkill.skill)
+    ).where(Specialist.id == specialist_id)
+
+    result = await db.execute(query)
+    s = result.scalar_one_or_none()
+    if not s:
+        return None
+
+    if may_lag(db, bumped_at):
+        # Possibly the row from before the bump: don't store it under the new version
+        return _serialize(s)
+
+    # Stored under the version seen before loading: if a write bumped it
+    # meanwhile, readers have moved on to the new key already.
+    return _store(key, s)
+
+
+def _serialize(s: Specialist) -> bytes:
+    return specialist_to_response(s).model_dump_json().encode()
+
+
+def _store(key: tuple, s: Specialist) -> bytes:
+    body = _serialize(s)
+    profile_cache.set(key, body, size=len(body))
+    _profile_users.set(s.user_id, s.id)
+    return body
+
+
+async def warm_profile_cache(db: AsyncSession, limit: int) -> int:
+    """Load the top `limit` profiles by rank_score in one round of queries."""
+    query = select(Specialist).options(
+        selectinload(Specialist.user),
+        selectinload(Specialist.skills).selectinload(SpecialistSkill.skill)
+    ).order_by(Specialist.rank_score.desc()).limit(limit)
+
+    result = await db.execute(query)
+    specialists = result.scalars().all()
+    for s in specialists:
+        _store((s.id, _versions.get(s.id, (0, None))[0]), s)
+    return len(specialists)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_profile_writes(session, flush_context):
+    changed = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Specialist):
+            changed.add(obj.id)
+        elif isinstance(obj, SpecialistSkill):
+            changed.add(obj.specialist_id)
+        elif isinstance(obj, User):
+            specialist_id = _profile_users.get(obj.id, None)
+            if specialist_id is not None:
+                changed.add(specialist_id)
+    if changed:
+        session.info.setdefault("changed_profiles", set()).update(changed)
+        for specialist_id in changed:
+            bump_profile_version(specialist_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_profiles_on_commit(session):
+    for specialist_id in session.info.pop("changed_profiles", ()):
+        bump_profile_version(specialist_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_profiles_on_rollback(session):
+    session.info.pop("changed_profiles", None)
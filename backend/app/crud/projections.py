@@ -0,0 +1,137 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.specialist import Specialist, SpecialistSkill
+from app.models.category import Skill
+from app.models.service import Service
+from app.models.order import Order
+from app.models.review import Review
+from app.models.user import User
+
+
+class Projection:
+    """Named columns of a response, read as plain rows instead of ORM entities."""
+
+    def __init__(self, **columns):
+        self.names = tuple(columns)
+        self.columns = [column.label(name) for name, column in columns.items()]
+
+    def select(self):
+        return select(*self.columns)
+
+    def to_dict(self, row) -> dict:
+        # Extra trailing columns (sort keys, distances) are ignored
+        return dict(zip(self.names, row))
+
+    def to_dicts(self, rows: Iterable) -> List[dict]:
+        names = self.names
+        return [dict(zip(names, row)) for row in rows]
+
+
+SPECIALIST_LIST = Projection(
+    id=Specialist.id,
+    user_id=Specialist.user_id,
+    title=Specialist.title,
+    description=Specialist.description,
+    city=Specialist.city,
+    experience=Specialist.experience,
+    rating=Specialist.rating,
+    review_count=Specialist.review_count,
+    completed_orders=Specialist.completed_orders,
+    response_time=Specialist.response_time,
+    is_verified=Specialist.is_verified,
+    is_premium=Specialist.is_premium,
+    is_available=Specialist.is_available,
+    education=Specialist.education,
+    min_price=Specialist.min_price,
+    max_price=Specialist.max_price,
+    created_at=Specialist.created_at,
+    user_name=User.name,
+    user_avatar=User.avatar,
+)
+
+SPECIALIST_SKILL = Projection(
+    specialist_id=SpecialistSkill.specialist_id,
+    id=Skill.id,
+    name=Skill.name,
+    level=SpecialistSkill.level,
+    years_exp=SpecialistSkill.years_exp,
+)
+
+SERVICE = Projection(
+    id=Service.id,
+    specialist_id=Service.specialist_id,
+    category_id=Service.category_id,
+    name=Service.name,
+    description=Service.description,
+    price=Service.price,
+    price_unit=Service.price_unit,
+    duration=Service.duration,
+    is_active=Service.is_active,
+    created_at=Service.created_at,
+)
+
+ORDER = Projection(
+    id=Order.id,
+    client_id=Order.client_id,
+    specialist_id=Order.specialist_id,
+    service_id=Order.service_id,
+    description=Order.description,
+    address=Order.address,
+    scheduled_at=Order.scheduled_at,
+    completed_at=Order.completed_at,
+    total_price=Order.total_price,
+    specialist_price=Order.specialist_price,
+    platform_fee=Order.platform_fee,
+    status=Order.status,
+    payment_status=Order.payment_status,
+    created_at=Order.created_at,
+)
+
+REVIEW = Projection(
+    id=Review.id,
+    order_id=Review.order_id,
+    user_id=Review.user_id,
+    specialist_id=Review.specialist_id,
+    rating=Review.rating,
+    comment=Review.comment,
+    pros=Review.pros,
+    cons=Review.cons,
+    response=Review.response,
+    is_published=Review.is_published,
+    created_at=Review.created_at,
+    user_name=User.name,
+    user_avatar=User.avatar,
+)
+
+
+def specialist_list_select():
+    return SPECIALIST_LIST.select().select_from(Specialist).outerjoin(User, User.id == Specialist.user_id)
+
+
+def review_select():
+    return REVIEW.select().select_from(Review).outerjoin(User, User.id == Review.user_id)
+
+
+async def load_skills(db: AsyncSession, specialist_ids: List[str]) -> Dict[str, List[dict]]:
+    """Skills of several specialists in one query, as SkillInfo dicts."""
+    skills = defaultdict(list)
+    if not specialist_ids:
+        return skills
+
+    query = SPECIALIST_SKILL.select().select_from(SpecialistSkill).join(
+        Skill, Skill.id == SpecialistSkill.skill_id
+    ).where(SpecialistSkill.specialist_id.in_(specialist_ids))
+
+    result = await db.execute(query)
+    for specialist_id, skill_id, name, level, years_exp in result.all():
+        skills[specialist_id].append({
+            "id": skill_id,
+            "name": name,
+            "level": level.value if level is not None else None,
+            "years_exp": years_exp,
+        })
+    return skills
@@ -0,0 +1,53 @@
+import math
+from typing import Optional
+
+from sqlalchemy import update, func, case, cast, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.specialist import Specialist
+
+# Bayesian prior: a rating is pulled towards PRIOR_MEAN as if the
+# specialist had PRIOR_WEIGHT extra reviews of that value.
+PRIOR_MEAN = 4.0
+PRIOR_WEIGHT = 10
+
+# Signal weights, summing to 1 so that rank_score is in [0, 1]
+RATING_WEIGHT = 0.6
+ORDERS_WEIGHT = 0.15
+VERIFIED_WEIGHT = 0.1
+PREMIUM_WEIGHT = 0.05
+RESPONSE_WEIGHT = 0.1
+
+ORDERS_SATURATION = 500  # completed orders that earn the full orders weight
+RESPONSE_HALF_LIFE = 60  # minutes of response time that halve the response signal
+
+
+def rank_score_expression():
+    """rank_score computed from the specialist's own denormalized columns."""
+    review_count = cast(func.coalesce(Specialist.review_count, 0), Float)
+    bayes_rating = (
+        (PRIOR_MEAN * PRIOR_WEIGHT + func.coalesce(Specialist.rating, 0) * review_count)
+        / (PRIOR_WEIGHT + review_count)
+    )
+    orders = func.least(
+        func.ln(1.0 + cast(func.coalesce(Specialist.completed_orders, 0), Float), type_=Float)
+        / math.log(1.0 + ORDERS_SATURATION),
+        1.0,
+        type_=Float,
+    )
+    responsiveness = 1.0 / (1.0 + func.coalesce(Specialist.response_time, 60) / float(RESPONSE_HALF_LIFE))
+    return (
+        RATING_WEIGHT * bayes_rating / 5.0
+        + ORDERS_WEIGHT * orders
+        + VERIFIED_WEIGHT * case((Specialist.is_verified == True, 1.0), else_=0.0)
+        + PREMIUM_WEIGHT * case((Specialist.is_premium == True, 1.0), else_=0.0)
+        + RESPONSE_WEIGHT * responsiveness
+    )
+
+
+async def refresh_rank_score(db: AsyncSession, specialist_id: Optional[str] = None) -> None:
+    stmt = update(Specialist).values(rank_score=rank_score_expression())
+    if specialist_id is not None:
+        stmt = stmt.where(Specialist.id == specialist_id)
+
+    await db.execute(stmt.execution_options(synchronize_session=False))
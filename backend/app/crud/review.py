@@ -0,0 +1,235 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update, delete, case, cast, func, Date, Numeric
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.review import Review, SpecialistReviewStats, SpecialistReviewDay
+from app.models.specialist import Specialist
+from app.crud.profile import mark_profile_changed, profile_cache
+from app.crud.ranking import refresh_rank_score
+from app.schemas.review import ReviewStatsResponse
+
+RECENT_DAYS = 90
+
+
+async def apply_review_rating(
+    db: AsyncSession, specialist_id: str, rating_delta: int, count_delta: int
+) -> Optional[Tuple[float, int]]:
+    """Move the specialist's running rating by one review's worth.
+
+    A single UPDATE: the row lock serializes concurrent reviews, and the
+    cost does not depend on how many reviews the specialist already has.
+    Returns the new (rating, review_count), or None if there is no such
+    specialist.
+    """
+    rating_sum = Specialist.rating_sum + rating_delta
+    rating_count = Specialist.rating_count + count_delta
+    stmt = (
+        update(Specialist)
+        .where(Specialist.id == specialist_id)
+        .values(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            review_count=rating_count,
+            rating=case(
+                (rating_count > 0, func.round(cast(rating_sum, Numeric) / rating_count, 2)),
+                else_=0.0,
+            ),
+        )
+        .returning(Specialist.rating, Specialist.review_count)
+    )
+    row = (await db.execute(stmt.execution_options(synchronize_session=False))).first()
+    if row is None:
+        return None
+
+    # rank_score is computed from the new rating, so it needs its own statement
+    await refresh_rank_score(db, specialist_id)
+    mark_profile_changed(db, [specialist_id])
+    return row.rating, row.review_count
+
+
+async def _add_review_stats(db: AsyncSession, specialist_id: str, values: dict) -> None:
+    stmt = insert(SpecialistReviewStats).values(specialist_id=specialist_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SpecialistReviewStats.specialist_id],
+        set_={
+            name: getattr(SpecialistReviewStats, name) + getattr(stmt.excluded, name)
+            for name in values
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _add_review_day(db: AsyncSession, specialist_id: str, day, rating_delta: int, count_delta: int) -> None:
+    stmt = insert(SpecialistReviewDay).values(
+        specialist_id=specialist_id, day=day, rating_sum=rating_delta, rating_count=count_delta
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SpecialistReviewDay.specialist_id, SpecialistReviewDay.day],
+        set_={
+            "rating_sum": SpecialistReviewDay.rating_sum + stmt.excluded.rating_sum,
+            "rating_count": SpecialistReviewDay.rating_count + stmt.excluded.rating_count,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def count_review(
+    db: AsyncSession, specialist_id: str, rating: int, day, responded: bool, sign: int
+) -> None:
+    """Add (sign=1) or remove (sign=-1) a published review from every aggregate.
+
+    day is the review's creation date, or an SQL expression for it.
+    """
+    await apply_review_rating(db, specialist_id, sign * rating, sign)
+    stats = {f"rating_{rating}": sign}
+    if responded:
+        stats["responded"] = sign
+    await _add_review_stats(db, specialist_id, stats)
+    await _add_review_day(db, specialist_id, day, sign * rating, sign)
+
+
+async def set_review_published(db: AsyncSession, review_id: str, published: bool) -> bool:
+    """Publish or unpublish a review and move the specialist's aggregates with it.
+
+    The flag flips in a conditional UPDATE, so of two concurrent requests
+    only one counts. Returns False if the review was already in that state.
+    """
+    if published:
+        condition = Review.is_published.is_not(True)
+    else:
+        condition = Review.is_published.is_(True)
+    stmt = (
+        update(Review)
+        .where(Review.id == review_id, condition)
+        .values(is_published=published)
+        .returning(
+            Review.specialist_id,
+            Review.rating,
+            cast(Review.created_at, Date).label("day"),
+            Review.response.is_not(None).label("responded"),
+        )
+    )
+    row = (await db.execute(stmt.execution_options(synchronize_session=False))).first()
+    if row is None:
+        return False
+
+    await count_review(db, row.specialist_id, row.rating, row.day, row.responded, 1 if published else -1)
+    return True
+
+
+async def set_review_response(db: AsyncSession, review_id: str, specialist_id: str, response: str) -> bool:
+    """Store the specialist's reply to a review. Returns False if there is no such review.
+
+    Only the first reply to a published review moves the response counter;
+    the IS NULL condition keeps a concurrent second reply from counting too.
+    """
+    stmt = (
+        update(Review)
+        .where(Review.id == review_id, Review.specialist_id == specialist_id, Review.response.is_(None))
+        .values(response=response)
+        .returning(Review.is_published)
+    )
+    row = (await db.execute(stmt.execution_options(synchronize_session=False))).first()
+    if row is not None:
+        if row.is_published:
+            await _add_review_stats(db, specialist_id, {"responded": 1})
+        return True
+
+    # Editing an existing reply
+    stmt = (
+        update(Review)
+        .where(Review.id == review_id, Review.specialist_id == specialist_id)
+        .values(response=response)
+        .returning(Review.id)
+    )
+    return (await db.execute(stmt.execution_options(synchronize_session=False))).first() is not None
+
+
+async def rebuild_review_stats(db: AsyncSession, specialist_id: Optional[str] = None) -> None:
+    """Recompute every review aggregate from the reviews table.
+
+    For data loaded around the write path, such as generated datasets.
+    """
+    published = [Review.is_published.is_(True)]
+    if specialist_id is not None:
+        published.append(Review.specialist_id == specialist_id)
+
+    def totals(aggregate):
+        return select(aggregate).where(Review.specialist_id == Specialist.id, *published).scalar_subquery()
+
+    rating_sum = totals(func.coalesce(func.sum(Review.rating), 0))
+    rating_count = totals(func.count())
+    stmt = update(Specialist).values(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        review_count=rating_count,
+        rating=totals(func.coalesce(func.round(func.avg(Review.rating), 2), 0)),
+    )
+    if specialist_id is not None:
+        stmt = stmt.where(Specialist.id == specialist_id)
+    await db.execute(stmt.execution_options(synchronize_session=False))
+
+    for model in (SpecialistReviewStats, SpecialistReviewDay):
+        stmt = delete(model)
+        if specialist_id is not None:
+            stmt = stmt.where(model.specialist_id == specialist_id)
+        await db.execute(stmt.execution_options(synchronize_session=False))
+
+    histogram = [func.count().filter(Review.rating == stars) for stars in range(1, 6)]
+    await db.execute(
+        insert(SpecialistReviewStats).from_select(
+            ["specialist_id", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5", "responded"],
+            select(Review.specialist_id, *histogram, func.count(Review.response))
+            .where(*published)
+            .group_by(Review.specialist_id),
+        )
+    )
+    day = cast(Review.created_at, Date)
+    await db.execute(
+        insert(SpecialistReviewDay).from_select(
+            ["specialist_id", "day", "rating_sum", "rating_count"],
+            select(Review.specialist_id, day, func.sum(Review.rating), func.count())
+            .where(*published)
+            .group_by(Review.specialist_id, day),
+        )
+    )
+
+    if specialist_id is not None:
+        await refresh_rank_score(db, specialist_id)
+        mark_profile_changed(db, [specialist_id])
+    else:
+        await refresh_rank_score(db)
+        profile_cache.clear()
+
+
+async def get_review_stats(db: AsyncSession, specialist_id: str) -> ReviewStatsResponse:
+    """Read from the counter tables only, never from reviews."""
+    stats = await db.get(SpecialistReviewStats, specialist_id)
+    histogram = {stars: getattr(stats, f"rating_{stars}") if stats else 0 for stars in range(1, 6)}
+    review_count = sum(histogram.values())
+    responded = stats.responded if stats else 0
+
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(SpecialistReviewDay.rating_sum), 0),
+            func.coalesce(func.sum(SpecialistReviewDay.rating_count), 0),
+        ).where(
+            SpecialistReviewDay.specialist_id == specialist_id,
+            SpecialistReviewDay.day >= func.current_date() - RECENT_DAYS,
+        )
+    )
+    recent_sum, recent_count = result.one()
+
+    return ReviewStatsResponse(
+        specialist_id=specialist_id,
+        review_count=review_count,
+        rating=round(sum(stars * n for stars, n in histogram.items()) / review_count, 2) if review_count else 0.0,
+        histogram=histogram,
+        recent_days=RECENT_DAYS,
+        recent_count=recent_count,
+        recent_rating=round(recent_sum / recent_count, 2) if recent_count else None,
+        responded=responded,
+        response_rate=round(responded / review_count, 4) if review_count else 0.0,
+    )
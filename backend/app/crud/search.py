@@ -0,0 +1,64 @@
+from typing import Optional
+
+from sqlalchemy import select, update, func, cast, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.specialist import Specialist, SpecialistSkill
+from app.models.category import Skill
+
+SEARCH_CONFIG = "russian"
+
+
+def _ts_config():
+    return cast(SEARCH_CONFIG, REGCONFIG)
+
+
+def _weighted(text, weight: str, config=None):
+    return func.setweight(
+        func.to_tsvector(config if config is not None else _ts_config(), func.coalesce(text, "")),
+        literal_column(f"'{weight}'"),
+    )
+
+
+async def refresh_search_document(db: AsyncSession, specialist_id: Optional[str] = None) -> None:
+    """Rebuild the search document of one specialist, or of all when no id is given."""
+    skill_names = (
+        select(func.string_agg(Skill.name, " "))
+        .select_from(SpecialistSkill)
+        .join(Skill, Skill.id == SpecialistSkill.skill_id)
+        .where(SpecialistSkill.specialist_id == Specialist.id)
+        .scalar_subquery()
+    )
+
+    stmt = update(Specialist).values(
+        # Title > skills > description > city
+        search_vector=(
+            _weighted(Specialist.title, "A")
+            .op("||")(_weighted(skill_names, "B"))
+            .op("||")(_weighted(Specialist.description, "C"))
+            .op("||")(_weighted(Specialist.city, "D", cast("simple", REGCONFIG)))
+        ),
+        search_text=func.lower(func.concat_ws(" ", Specialist.title, skill_names, Specialist.city)),
+    )
+    if specialist_id is not None:
+        stmt = stmt.where(Specialist.id == specialist_id)
+
+    await db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def search_filter(search: str):
+    # Stemmed full-text match, or a fuzzy trigram match to tolerate typos
+    tsquery = func.websearch_to_tsquery(_ts_config(), search)
+    return or_(
+        Specialist.search_vector.op("@@")(tsquery),
+        literal(search.lower()).op("<%")(Specialist.search_text),
+    )
+
+
+def search_rank(search: str):
+    tsquery = func.websearch_to_tsquery(_ts_config(), search)
+    return (
+        func.ts_rank_cd(Specialist.search_vector, tsquery)
+        + func.word_similarity(search.lower(), Specialist.search_text)
+    )
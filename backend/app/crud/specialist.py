@@ -0,0 +1,54 @@
+from typing import Optional
+
+from sqlalchemy import select, update, func, union, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.specialist import Specialist, SpecialistSkill
+from app.models.category import Skill
+from app.models.service import Service
+from app.crud.profile import mark_profile_changed, profile_cache
+
+
+async def refresh_specialist_categories(db: AsyncSession, specialist_id: Optional[str] = None) -> None:
+    """Rebuild category membership from active services and skills."""
+    memberships = union(
+        select(Service.category_id.label("category_id")).where(
+            Service.specialist_id == Specialist.id,
+            Service.is_active == True
+        ).correlate(Specialist),
+        select(Skill.category_id.label("category_id"))
+        .join(SpecialistSkill, SpecialistSkill.skill_id == Skill.id)
+        .where(SpecialistSkill.specialist_id == Specialist.id)
+        .correlate(Specialist),
+    ).subquery()
+
+    category_ids = select(func.array_agg(memberships.c.category_id)).scalar_subquery()
+
+    stmt = update(Specialist).values(
+        category_ids=func.coalesce(category_ids, literal_column("'{}'::varchar[]"))
+    )
+    if specialist_id is not None:
+        stmt = stmt.where(Specialist.id == specialist_id)
+
+    await db.execute(stmt.execution_options(synchronize_session=False))
+
+
+async def refresh_specialist_prices(db: AsyncSession, specialist_id: Optional[str] = None) -> None:
+    """Rebuild the min/max price of active services."""
+    def price(aggregate):
+        return select(aggregate(Service.price)).where(
+            Service.specialist_id == Specialist.id,
+            Service.is_active == True
+        ).scalar_subquery()
+
+    stmt = update(Specialist).values(min_price=price(func.min), max_price=price(func.max))
+    if specialist_id is not None:
+        stmt = stmt.where(Specialist.id == specialist_id)
+
+    await db.execute(stmt.execution_options(synchronize_session=False))
+
+    # Prices are part of the profile
+    if specialist_id is not None:
+        mark_profile_changed(db, [specialist_id])
+    else:
+        profile_cache.clear()
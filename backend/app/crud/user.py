@@ -0,0 +1,14 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, UserRole
+
+
+async def require_admin(db: AsyncSession, user_id: str) -> None:
+    result = await db.execute(select(User.role).where(User.id == user_id))
+    if result.scalar_one_or_none() != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав"
+        )
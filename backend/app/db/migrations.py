@@ -0,0 +1,35 @@
+from pathlib import Path
+from typing import Optional
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def head_revision() -> Optional[str]:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+async def check_schema_version(engine: AsyncEngine) -> str:
+    """Fail fast unless the database is at the latest migration.
+
+    One query: migrations run as a release step, never from the workers.
+    """
+    head = head_revision()
+    try:
+        async with engine.connect() as conn:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+    except ProgrammingError:
+        # alembic_version does not exist: the database was never migrated
+        current = None
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at {current or 'no revision'}, expected {head}: run `alembic upgrade head`"
+        )
+    return current
@@ -0,0 +1,69 @@
+import logging
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection.
+
+    The wait includes opening a new connection when the pool grows, which
+    is what the request sees either way.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self._overflow
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                "DB pool checkout timed out after %.0f ms (in use %d, overflow %d)",
+                (time.perf_counter() - started) * 1000, self.checkedout(), self.overflow(),
+            )
+            raise
+        waited = time.perf_counter() - started
+        
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        # _overflow counts up from -pool_size; above zero the pool overflowed
+        if self._overflow > overflow and self._overflow > 0:
+            self.overflow_events += 1
+        if waited * 1000 >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+            self.slow_checkouts += 1
+            logger.warning(
+                "Slow DB pool checkout: %.0f ms (in use %d, overflow %d)",
+                waited * 1000, self.checkedout(), self.overflow(),
+            )
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "slow_checkouts": self.slow_checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+        }
@@ -1,11 +1,53 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from app.core.config import settings
+from app.core.security import get_optional_user_id
+from app.db.pool import InstrumentedPool
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-)
+logger = logging.getLogger(__name__)
+
+
+def _engine_options(url: str, connect_timeout: Optional[float] = None) -> dict:
+    options = dict(
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.startswith("postgresql+asyncpg"):
+        # SQLAlchemy's prepared statement LRU and asyncpg's own cache
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if connect_timeout is not None:
+            options["connect_args"]["timeout"] = connect_timeout
+    return options
+
+
+def _read_sessionmaker(bind: AsyncEngine, replica: bool = False) -> async_sessionmaker:
+    # Reads run in autocommit: no BEGIN/COMMIT round trips, and the connection
+    # goes back to the pool as soon as the handler is done with it
+    return async_sessionmaker(
+        bind.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info={"replica": replica},
+    )
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -15,8 +57,117 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = _read_sessionmaker(engine)
+
+
+class ReplicaRouter:
+    """Round-robin over the replicas that passed their last health check.
+
+    pick() returns None when no replica is usable; callers fall back to
+    the primary.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self.sessionmakers = [_read_sessionmaker(e, replica=True) for e in engines]
+        self.healthy = [True] * len(engines)
+        self._next = 0
+
+    def pick(self) -> Optional[int]:
+        for _ in range(len(self.engines)):
+            index = self._next % len(self.engines)
+            self._next += 1
+            if self.healthy[index]:
+                return index
+        return None
+
+    def mark(self, index: int, healthy: bool, error: Optional[BaseException] = None) -> None:
+        if healthy != self.healthy[index]:
+            if healthy:
+                logger.info("Replica %d is back in rotation", index)
+            else:
+                logger.warning("Replica %d taken out of rotation: %r", index, error)
+        self.healthy[index] = healthy
+
+    @staticmethod
+    async def _ping(replica: AsyncEngine) -> None:
+        async with replica.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        for index, replica in enumerate(self.engines):
+            try:
+                # The timeout covers connecting too: an unreachable host
+                # hangs in connect, not in the query
+                await asyncio.wait_for(self._ping(replica), settings.REPLICA_HEALTH_CHECK_TIMEOUT)
+            except Exception as e:
+                self.mark(index, False, e)
+            else:
+                self.mark(index, True)
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL)
+
+
+replicas = ReplicaRouter([
+    create_async_engine(url, **_engine_options(url, connect_timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT))
+    for url in settings.DATABASE_REPLICA_URLS
+])
 
-async def get_db():
+# user_id -> monotonic deadline until which the user reads from the primary.
+# Per worker process: a user whose next request lands on another worker
+# may still read from a replica that has not caught up.
+_pinned: Dict[str, float] = {}
+
+
+def pin_to_primary(user_id: str) -> None:
+    """Route the user's reads to the primary for READ_YOUR_WRITES_WINDOW."""
+    if not replicas.engines or not settings.READ_YOUR_WRITES_WINDOW:
+        return
+    now = time.monotonic()
+    if len(_pinned) > 10000:
+        for key in [k for k, deadline in _pinned.items() if deadline <= now]:
+            del _pinned[key]
+    _pinned[user_id] = now + settings.READ_YOUR_WRITES_WINDOW
+
+
+def _is_pinned(user_id: Optional[str]) -> bool:
+    return user_id is not None and _pinned.get(user_id, 0) > time.monotonic()
+
+
+def may_lag(db: AsyncSession, changed_at: Optional[float]) -> bool:
+    """Whether db reads from a replica that may not have a write made at changed_at yet.
+
+    changed_at is a time.monotonic() value from this process; as for
+    pinning, replicas are assumed to catch up within READ_YOUR_WRITES_WINDOW.
+    Caches that writes invalidate must not be filled from such reads.
+    """
+    return (
+        changed_at is not None
+        and db.info.get("replica", False)
+        and time.monotonic() - changed_at < settings.READ_YOUR_WRITES_WINDOW
+    )
+
+
+def reads_own_writes(db: AsyncSession) -> bool:
+    """Whether db serves a user inside their read-your-writes window.
+
+    Caches that writes do not invalidate (counts, facets) are bypassed for
+    such sessions, so the writer sees their change.
+    """
+    return db.info.get("pinned", False)
+
+
+def pool_stats() -> dict:
+    stats = {"primary": engine.sync_engine.pool.stats()}
+    for index, replica in enumerate(replicas.engines):
+        stats[f"replica-{index}"] = dict(replica.sync_engine.pool.stats(), healthy=replicas.healthy[index])
+    return stats
+
+
+async def get_db(user_id: Optional[str] = Depends(get_optional_user_id)):
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -26,7 +177,44 @@ async def get_db():
             raise
         finally:
             await session.close()
+    if user_id:
+        pin_to_primary(user_id)
+
 
+async def get_read_db(user_id: Optional[str] = Depends(get_optional_user_id)):
+    """Session for handlers that only read. Never committed.
 
+    Served by a replica when one is configured and healthy, unless the
+    user wrote recently. A replica that cannot be reached is taken out of
+    rotation and the request falls back to the primary.
+    """
+    session = None
+    pinned = _is_pinned(user_id)
+    if replicas.engines and not pinned:
+        index = replicas.pick()
+        if index is not None:
+            session = replicas.sessionmakers[index]()
+            try:
+                # Connect before the handler runs, while falling back is still possible
+                await session.connection()
+            except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+                await session.close()
+                replicas.mark(index, False, e)
+                session = None
+    if session is None:
+        session = ReadSessionLocal()
+        session.info["pinned"] = pinned
+    async with session:
+        yield session
 
 
+async def stream_rows(query, batch_size: int = 500) -> AsyncIterator[List]:
+    """Yield batches of rows from a server-side cursor.
+
+    Opens its own session: streamed bodies are sent after request
+    dependencies such as get_db have already been closed.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
@@ -1,20 +1,75 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from sqlalchemy import text
 
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.db.session import engine
-from app.db.base import Base
+from app.db.session import engine, replicas, ReadSessionLocal
+from app.db.migrations import check_schema_version
+from app.crud.category import get_category_tree
+from app.crud.profile import warm_profile_cache
+from app.crud.counters import run_counter_jobs
+
+# app.* loggers report at INFO next to uvicorn's own log lines; other
+# libraries keep their defaults
+_handler = logging.StreamHandler()
+_handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s - %(message)s"))
+logging.getLogger("app").addHandler(_handler)
+logging.getLogger("app").setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def _warm_pool(pool_engine, connections: int) -> None:
+    # Held concurrently so that each one is a separate connection
+    async def touch():
+        async with pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await asyncio.gather(*[touch() for _ in range(connections)])
+
+
+async def _warm_caches() -> None:
+    async with ReadSessionLocal() as db:
+        await get_category_tree(db)
+        if settings.STARTUP_WARM_PROFILES:
+            await warm_profile_cache(db, settings.STARTUP_WARM_PROFILES)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: the schema is managed by migrations (alembic upgrade head)
+    started = time.perf_counter()
+    timings = {}
+    
+    async def phase(name, coro):
+        t = time.perf_counter()
+        await coro
+        timings[name] = (time.perf_counter() - t) * 1000
+    
+    await phase("schema check", check_schema_version(engine))
+    await phase("pool warm-up", _warm_pool(engine, settings.DB_POOL_WARM_CONNECTIONS))
+    if replicas.engines:
+        await phase("replica pool warm-up", asyncio.gather(*[
+            _warm_pool(replica, settings.DB_POOL_WARM_CONNECTIONS) for replica in replicas.engines
+        ], return_exceptions=True))
+    await phase("cache warm-up", _warm_caches())
+    logger.info(
+        "Startup in %.0f ms (%s)",
+        (time.perf_counter() - started) * 1000,
+        ", ".join(f"{name} {ms:.0f} ms" for name, ms in timings.items()),
+    )
+    health_checks = asyncio.create_task(replicas.run_health_checks()) if replicas.engines else None
+    counter_jobs = asyncio.create_task(run_counter_jobs())
     yield
     # Shutdown
+    counter_jobs.cancel()
+    if health_checks:
+        health_checks.cancel()
+    for replica in replicas.engines:
+        await replica.dispose()
     await engine.dispose()
 
 
@@ -34,6 +89,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Routes
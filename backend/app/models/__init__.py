@@ -1,15 +1,16 @@
 from app.models.user import User, UserRole
-from app.models.specialist import Specialist, SpecialistSkill, SkillLevel
+from app.models.specialist import Specialist, SpecialistSkill, SpecialistCounterDelta, SkillLevel
 from app.models.category import Category, Skill
 from app.models.service import Service
 from app.models.order import Order, OrderStatus, PaymentStatus
-from app.models.review import Review
+from app.models.review import Review, SpecialistReviewStats, SpecialistReviewDay
 
 __all__ = [
     "User",
     "UserRole", 
     "Specialist",
     "SpecialistSkill",
+    "SpecialistCounterDelta",
     "SkillLevel",
     "Category",
     "Skill",
@@ -18,6 +19,8 @@ __all__ = [
     "OrderStatus",
     "PaymentStatus",
     "Review",
+    "SpecialistReviewStats",
+    "SpecialistReviewDay",
 ]
 
 
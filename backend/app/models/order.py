@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 import enum
 from app.db.base import Base, TimestampMixin
@@ -22,6 +22,11 @@ class PaymentStatus(str, enum.Enum):
 
 class Order(Base, TimestampMixin):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order histories, newest first, per status, see app.crud.order
+        Index("ix_orders_client_status_created_id", "client_id", "status", "created_at", "id"),
+        Index("ix_orders_specialist_status_created_id", "specialist_id", "status", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True)
     client_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, Integer, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base, TimestampMixin
 
 
 class Review(Base, TimestampMixin):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # A specialist's published reviews, newest first, keyset paginated
+        Index("ix_reviews_specialist_published_created_id", "specialist_id", "is_published", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True)
     order_id = Column(String, ForeignKey("orders.id", ondelete="CASCADE"), unique=True, nullable=False)
@@ -23,5 +27,24 @@ class Review(Base, TimestampMixin):
     specialist = relationship("Specialist", back_populates="reviews")
 
 
+class SpecialistReviewStats(Base):
+    """Published review counters per specialist, kept by app.crud.review."""
+    __tablename__ = "specialist_review_stats"
 
+    specialist_id = Column(String, ForeignKey("specialists.id", ondelete="CASCADE"), primary_key=True)
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    responded = Column(Integer, nullable=False, default=0, server_default="0")  # with Review.response
 
+
+class SpecialistReviewDay(Base):
+    """Published review totals per specialist and day, for windowed averages."""
+    __tablename__ = "specialist_review_days"
+
+    specialist_id = Column(String, ForeignKey("specialists.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
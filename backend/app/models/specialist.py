@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Boolean, Text, DateTime, ForeignKey, Index, UniqueConstraint, func, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import enum
 from app.db.base import Base, TimestampMixin
 
@@ -13,6 +14,23 @@ class SkillLevel(str, enum.Enum):
 
 class Specialist(Base, TimestampMixin):
     __tablename__ = "specialists"
+    __table_args__ = (
+        # Keyset pagination: (sort key, id) for every sort_by option
+        Index("ix_specialists_rating_id", "rating", "id"),
+        Index("ix_specialists_review_count_id", "review_count", "id"),
+        Index("ix_specialists_experience_id", "experience", "id"),
+        Index("ix_specialists_min_price_id", "min_price", "id"),
+        Index("ix_specialists_rank_score_id", "rank_score", "id"),
+        # Search: full-text document and trigram text (needs pg_trgm)
+        Index("ix_specialists_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_specialists_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index("ix_specialists_category_ids", "category_ids", postgresql_using="gin"),
+        # Proximity: prefix scans over geohash cells
+        Index("ix_specialists_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
@@ -20,9 +38,15 @@ class Specialist(Base, TimestampMixin):
     description = Column(Text, nullable=False)
     city = Column(String, nullable=False, index=True)
     address = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # of (latitude, longitude), see app.core.geo
     experience = Column(Integer, default=0)
     rating = Column(Float, default=0.0, index=True)
     review_count = Column(Integer, default=0)
+    # Running totals over published reviews, see app.crud.review
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
     completed_orders = Column(Integer, default=0)
     response_time = Column(Integer, default=60)  # minutes
     is_verified = Column(Boolean, default=False, index=True)
@@ -31,6 +55,22 @@ class Specialist(Base, TimestampMixin):
     education = Column(String, nullable=True)
     work_schedule = Column(String, nullable=True)
     
+    # Categories of active services and skills, maintained by
+    # app.crud.specialist.refresh_specialist_categories
+    category_ids = Column(ARRAY(String), nullable=False, default=list, server_default="{}")
+    
+    # Price range of active services, maintained by
+    # app.crud.specialist.refresh_specialist_prices
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True, index=True)
+    
+    # Composite ranking, maintained by app.crud.ranking.refresh_rank_score
+    rank_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    
+    # Search document, maintained by app.crud.search.refresh_search_document
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    search_text = deferred(Column(Text, nullable=True))
+    
     # Relationships
     user = relationship("User", back_populates="specialist")
     skills = relationship("SpecialistSkill", back_populates="specialist", cascade="all, delete-orphan")
@@ -41,6 +81,9 @@ class Specialist(Base, TimestampMixin):
 
 class SpecialistSkill(Base, TimestampMixin):
     __tablename__ = "specialist_skills"
+    __table_args__ = (
+        UniqueConstraint("specialist_id", "skill_id", name="uq_specialist_skills_specialist_skill"),
+    )
     
     id = Column(String, primary_key=True)
     specialist_id = Column(String, ForeignKey("specialists.id", ondelete="CASCADE"), nullable=False)
@@ -53,5 +96,14 @@ class SpecialistSkill(Base, TimestampMixin):
     skill = relationship("Skill")
 
 
+class SpecialistCounterDelta(Base):
+    """Append-only counter changes, folded into specialists by app.crud.counters.
 
-
+    Writers insert a row instead of updating the hot specialists row.
+    """
+    __tablename__ = "specialist_counter_deltas"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    specialist_id = Column(String, ForeignKey("specialists.id", ondelete="CASCADE"), nullable=False)
+    completed_orders = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
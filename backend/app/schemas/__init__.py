@@ -1,5 +1,5 @@
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.schemas.specialist import SpecialistCreate, SpecialistResponse, SpecialistListResponse
+from app.schemas.specialist import SpecialistCreate, SpecialistResponse, SpecialistListResponse, SpecialistFacetsResponse
 from app.schemas.category import CategoryResponse, SkillResponse
 from app.schemas.service import ServiceCreate, ServiceResponse
 from app.schemas.order import OrderCreate, OrderResponse
@@ -13,6 +13,7 @@ __all__ = [
     "SpecialistCreate",
     "SpecialistResponse",
     "SpecialistListResponse",
+    "SpecialistFacetsResponse",
     "CategoryResponse",
     "SkillResponse",
     "ServiceCreate",
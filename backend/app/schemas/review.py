@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 
@@ -11,6 +11,10 @@ class ReviewCreate(BaseModel):
     cons: Optional[str] = None
 
 
+class ReviewReply(BaseModel):
+    response: str = Field(..., min_length=1)
+
+
 class ReviewResponse(BaseModel):
     id: str
     order_id: str
@@ -32,5 +36,13 @@ class ReviewResponse(BaseModel):
         from_attributes = True
 
 
-
-
+class ReviewStatsResponse(BaseModel):
+    specialist_id: str
+    review_count: int
+    rating: float
+    histogram: Dict[int, int]  # stars -> published reviews
+    recent_days: int
+    recent_count: int
+    recent_rating: Optional[float]
+    responded: int
+    response_rate: float
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -19,6 +19,8 @@ class SpecialistCreate(BaseModel):
     city: str
     experience: int = 0
     education: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     skills: List[str] = []  # skill IDs
 
 
@@ -37,12 +39,17 @@ class SpecialistResponse(BaseModel):
     is_premium: bool
     is_available: bool
     education: Optional[str]
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
     created_at: datetime
     
     # Nested
     user_name: Optional[str] = None
     user_avatar: Optional[str] = None
     skills: List[SkillInfo] = []
+    
+    # Set on proximity searches; the coordinates themselves stay private
+    distance_km: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -50,11 +57,17 @@ class SpecialistResponse(BaseModel):
 
 class SpecialistListResponse(BaseModel):
     items: List[SpecialistResponse]
-    total: int
+    total: Optional[int]
     page: int
     per_page: int
-    pages: int
-
-
+    pages: Optional[int]
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
+class SpecialistFacetsResponse(BaseModel):
+    total: int
+    cities: Dict[str, int]
+    ratings: Dict[int, int]  # floor(rating) -> count
+    verified: int
+    categories: Dict[str, int]  # category id -> count
@@ -0,0 +1,297 @@
+"""Deterministic synthetic dataset for benchmarks, written to DATABASE_URL.
+
+    python -m benchmarks.datagen --reset --specialists 5000 --clients 20000 --orders 100000
+
+The same --seed always produces the same rows, ids and timestamps
+included (only the bcrypt salt differs), so runs on different machines
+or commits are comparable. Every generated account signs in with
+PASSWORD. --reset truncates all tables first; the schema must already
+be migrated (alembic upgrade head).
+"""
+import argparse
+import asyncio
+import bisect
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List
+
+from sqlalchemy import insert, text, update, bindparam
+
+from app.bulk_import import refresh_denormalized
+from app.core.geo import geohash_encode
+from app.core.security import get_password_hash
+from app.crud.review import rebuild_review_stats
+from app.db.session import AsyncSessionLocal, engine
+from app.models import (
+    Category, Skill, User, UserRole, Specialist, SpecialistSkill, SkillLevel,
+    Service, Order, OrderStatus, PaymentStatus, Review,
+)
+
+PASSWORD = "benchmark123"
+EPOCH = datetime(2025, 1, 1)
+BATCH_SIZE = 2000
+
+# name, slug, typical price, skills
+CATEGORIES = [
+    ("Ремонт и строительство", "repair", 3000, ["Сантехника", "Электрика", "Плиточные работы", "Малярные работы", "Сборка мебели"]),
+    ("Уборка", "cleaning", 2500, ["Генеральная уборка", "Мойка окон", "Химчистка мебели", "Уборка после ремонта"]),
+    ("Репетиторы", "tutors", 1500, ["Математика", "Английский язык", "Физика", "Русский язык", "Программирование"]),
+    ("Красота и здоровье", "beauty", 2000, ["Маникюр", "Стрижка", "Массаж", "Макияж"]),
+    ("Компьютерная помощь", "computer-help", 1200, ["Ремонт ноутбуков", "Настройка Wi-Fi", "Установка Windows", "Восстановление данных"]),
+    ("Перевозки", "moving", 4000, ["Грузчики", "Квартирный переезд", "Вывоз мусора"]),
+    ("Фото и видео", "photo-video", 5000, ["Свадебная съёмка", "Фотосессия", "Видеомонтаж"]),
+    ("Бытовая техника", "appliances", 2200, ["Ремонт стиральных машин", "Ремонт холодильников", "Установка техники"]),
+]
+
+# name, latitude, longitude, share of specialists and clients
+CITIES = [
+    ("Москва", 55.7558, 37.6173, 0.38),
+    ("Санкт-Петербург", 59.9343, 30.3351, 0.18),
+    ("Новосибирск", 55.0084, 82.9357, 0.07),
+    ("Екатеринбург", 56.8389, 60.6057, 0.07),
+    ("Казань", 55.7887, 49.1221, 0.06),
+    ("Нижний Новгород", 56.2965, 43.9361, 0.06),
+    ("Краснодар", 45.0355, 38.9753, 0.06),
+    ("Самара", 53.1959, 50.1002, 0.06),
+    ("Ростов-на-Дону", 47.2357, 39.7015, 0.06),
+]
+
+ORDER_STATUSES = [
+    (OrderStatus.COMPLETED, 0.55), (OrderStatus.PENDING, 0.15), (OrderStatus.ACCEPTED, 0.10),
+    (OrderStatus.CANCELLED, 0.10), (OrderStatus.IN_PROGRESS, 0.08), (OrderStatus.DISPUTED, 0.02),
+]
+REVIEW_SHARE = 0.6  # of completed orders
+COMMENTS = [
+    "Всё сделал быстро и аккуратно, рекомендую",
+    "Хороший специалист, пришёл вовремя",
+    "Результатом доволен, обращусь ещё",
+    "Нормально, но пришлось подождать",
+    "Цена соответствует качеству",
+    "Не всё получилось с первого раза",
+]
+
+
+class Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def timestamp(self, days: int) -> datetime:
+        # Within `days` before EPOCH
+        return EPOCH - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def city(self):
+        return self.rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+
+
+async def _insert(table, rows: Iterator[dict], label: str) -> int:
+    total = 0
+    batch: List[dict] = []
+
+    async def flush():
+        async with engine.begin() as conn:
+            await conn.execute(insert(table), batch)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+            total += len(batch)
+            batch = []
+            print(f"\r{label}: {total}", end="", file=sys.stderr, flush=True)
+    if batch:
+        await flush()
+        total += len(batch)
+    print(f"\r{label}: {total}", file=sys.stderr, flush=True)
+    return total
+
+
+async def generate(seed: int, specialists: int, clients: int, orders: int, reset: bool) -> Dict[str, int]:
+    g = Generator(seed)
+    rng = g.rng
+    password_hash = get_password_hash(PASSWORD)
+    counts: Dict[str, int] = {}
+
+    if reset:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "TRUNCATE reviews, orders, services, specialist_skills, specialists, skills, categories, users CASCADE"
+            ))
+
+    # Catalog
+    categories, skills = [], []
+    for position, (name, slug, _, skill_names) in enumerate(CATEGORIES):
+        category_id = g.uuid()
+        categories.append(dict(
+            id=category_id, name=name, slug=slug, description=f"Услуги: {name.lower()}",
+            order=position, is_active=True, created_at=EPOCH, updated_at=EPOCH,
+        ))
+        for i, skill_name in enumerate(skill_names):
+            skills.append(dict(
+                id=g.uuid(), name=skill_name, slug=f"{slug}-{i + 1}", category_id=category_id,
+                created_at=EPOCH, updated_at=EPOCH,
+            ))
+    counts["categories"] = await _insert(Category.__table__, iter(categories), "categories")
+    counts["skills"] = await _insert(Skill.__table__, iter(skills), "skills")
+    skills_by_category = {c["id"]: [s for s in skills if s["category_id"] == c["id"]] for c in categories}
+    base_price = {c["id"]: CATEGORIES[i][2] for i, c in enumerate(categories)}
+
+    # Users: specialists first, then clients
+    user_ids = [g.uuid() for _ in range(specialists + clients)]
+
+    def users():
+        for i, user_id in enumerate(user_ids):
+            is_specialist = i < specialists
+            created = g.timestamp(720)
+            yield dict(
+                id=user_id,
+                email=f"{'specialist' if is_specialist else 'client'}{i if is_specialist else i - specialists}@example.com",
+                password_hash=password_hash,
+                name=f"{'Специалист' if is_specialist else 'Клиент'} {i}",
+                role=UserRole.SPECIALIST if is_specialist else UserRole.CLIENT,
+                is_verified=rng.random() < 0.5, is_active=True,
+                created_at=created, updated_at=created,
+            )
+    counts["users"] = await _insert(User.__table__, users(), "users")
+
+    # Specialists: a hidden quality drives their ratings, a heavy-tailed
+    # popularity drives how many orders they get
+    specialist_ids = [g.uuid() for _ in range(specialists)]
+    quality = [rng.uniform(3.2, 5.0) for _ in range(specialists)]
+    popularity = list(accumulate(rng.paretovariate(1.2) for _ in range(specialists)))
+
+    def specialist_rows():
+        for i, specialist_id in enumerate(specialist_ids):
+            city, lat, lon, _ = g.city()
+            lat += rng.gauss(0, 0.08)
+            lon += rng.gauss(0, 0.12)
+            created = g.timestamp(700)
+            yield dict(
+                id=specialist_id, user_id=user_ids[i], title=f"Мастер {i}",
+                description=f"Опыт работы и отзывы клиентов. Специалист {i} из города {city}.",
+                city=city, latitude=lat, longitude=lon, geohash=geohash_encode(lat, lon),
+                experience=rng.randint(0, 25), rating=0.0, review_count=0, completed_orders=0,
+                response_time=rng.choice([15, 30, 60, 120, 240]),
+                is_verified=rng.random() < 0.4, is_premium=rng.random() < 0.1,
+                is_available=rng.random() < 0.9, category_ids=[],
+                created_at=created, updated_at=created,
+            )
+    counts["specialists"] = await _insert(Specialist.__table__, specialist_rows(), "specialists")
+
+    # Skills and services: 1-3 categories per specialist
+    services: List[tuple] = []  # (service_id, specialist index, price)
+
+    def skill_and_service_rows():
+        for i, specialist_id in enumerate(specialist_ids):
+            for category in rng.sample(categories, rng.randint(1, 3)):
+                for skill in rng.sample(skills_by_category[category["id"]], rng.randint(1, 2)):
+                    yield "skill", dict(
+                        id=g.uuid(), specialist_id=specialist_id, skill_id=skill["id"],
+                        level=rng.choice(list(SkillLevel)), years_exp=rng.randint(0, 15),
+                        created_at=EPOCH, updated_at=EPOCH,
+                    )
+                for n in range(rng.randint(1, 3)):
+                    price = round(base_price[category["id"]] * rng.lognormvariate(0, 0.4) / 50) * 50 or 50
+                    service_id = g.uuid()
+                    services.append((service_id, i, float(price)))
+                    yield "service", dict(
+                        id=service_id, specialist_id=specialist_id, category_id=category["id"],
+                        name=f"{category['name']}: услуга {n + 1}", description="Выезд и работа на месте",
+                        price=float(price), price_unit="за услугу", duration=rng.choice([30, 60, 120, 240]),
+                        is_active=rng.random() < 0.95, created_at=EPOCH, updated_at=EPOCH,
+                    )
+
+    pairs = list(skill_and_service_rows())
+    counts["specialist_skills"] = await _insert(SpecialistSkill.__table__, (r for kind, r in pairs if kind == "skill"), "specialist_skills")
+    counts["services"] = await _insert(Service.__table__, (r for kind, r in pairs if kind == "service"), "services")
+    services_by_specialist: Dict[int, List[tuple]] = {}
+    for service in services:
+        services_by_specialist.setdefault(service[1], []).append(service)
+
+    # Orders and reviews, with the specialist aggregates they imply
+    completed = [0] * specialists
+    reviews: List[dict] = []
+    statuses, status_weights = zip(*ORDER_STATUSES)
+
+    def order_rows():
+        for _ in range(orders):
+            index = bisect.bisect(popularity, rng.random() * popularity[-1])
+            service_id, _, price = rng.choice(services_by_specialist[index])
+            client_id = user_ids[specialists + rng.randrange(clients)]
+            status = rng.choices(statuses, weights=status_weights)[0]
+            created = g.timestamp(365)
+            order_id = g.uuid()
+            fee = round(price * 0.15, 2)
+            done = status == OrderStatus.COMPLETED
+            if done:
+                completed[index] += 1
+                if rng.random() < REVIEW_SHARE:
+                    rating = min(5, max(1, round(rng.gauss(quality[index], 0.8))))
+                    reviewed = created + timedelta(days=rng.randint(1, 14))
+                    reviews.append(dict(
+                        id=g.uuid(), order_id=order_id, user_id=client_id,
+                        specialist_id=specialist_ids[index], rating=rating,
+                        comment=rng.choice(COMMENTS), is_published=True,
+                        created_at=reviewed, updated_at=reviewed,
+                    ))
+            yield dict(
+                id=order_id, client_id=client_id, specialist_id=specialist_ids[index],
+                service_id=service_id, description="Нужна помощь", address="По договорённости",
+                scheduled_at=created + timedelta(days=rng.randint(0, 7)),
+                completed_at=created + timedelta(days=rng.randint(1, 10)) if done else None,
+                total_price=price, specialist_price=price - fee, platform_fee=fee,
+                status=status,
+                payment_status=PaymentStatus.RELEASED if done else (
+                    PaymentStatus.REFUNDED if status == OrderStatus.CANCELLED else PaymentStatus.HELD
+                ),
+                created_at=created, updated_at=created,
+            )
+
+    counts["orders"] = await _insert(Order.__table__, order_rows(), "orders")
+    counts["reviews"] = await _insert(Review.__table__, iter(reviews), "reviews")
+
+    # Ratings and review stats are rebuilt from the reviews afterwards
+    aggregates = [dict(b_id=specialist_ids[i], b_completed=completed[i]) for i in range(specialists)]
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(Specialist.__table__)
+            .where(Specialist.__table__.c.id == bindparam("b_id"))
+            .values(completed_orders=bindparam("b_completed")),
+            aggregates,
+        )
+    return counts
+
+
+async def main_async(args) -> None:
+    started = time.perf_counter()
+    try:
+        counts = await generate(args.seed, args.specialists, args.clients, args.orders, args.reset)
+        t = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await rebuild_review_stats(db)
+            await db.commit()
+        await refresh_denormalized()
+        print(f"denormalized columns: {time.perf_counter() - t:.1f} s", file=sys.stderr)
+    finally:
+        await engine.dispose()
+    print(f"done in {time.perf_counter() - started:.1f} s: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--specialists", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--reset", action="store_true", help="truncate all tables first")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Latency and queries per request of the hot endpoints, in-process.
+
+    python -m benchmarks.datagen --reset                      # once
+    python -m benchmarks.endpoints --out before.json
+    python -m benchmarks.endpoints --out after.json --compare before.json
+
+Requests go through the whole FastAPI app (routing, dependencies,
+encoding) over the ASGI transport and hit the real database, without a
+network hop. They run one at a time, so database queries can be counted
+exactly per request. Caches behave as in production: repeated requests
+for hot keys are served from them.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import event, text
+
+from app.core.security import create_access_token
+from app.db.session import engine, replicas
+from app.main import app
+from benchmarks.datagen import PASSWORD
+
+SEARCH_TERMS = ["сантехника", "ремонт", "маникюр", "английский", "уборка", "мастер"]
+TABLES = ["users", "specialists", "services", "orders", "reviews"]
+
+Request = Tuple[str, str, dict]  # method, url, httpx kwargs
+
+
+class Samples:
+    """Ids and parameters drawn from the database under test."""
+
+    async def load(self) -> None:
+        async with engine.connect() as conn:
+            async def column(sql: str) -> list:
+                return list((await conn.execute(text(sql))).scalars())
+
+            self.specialists = await column("SELECT id FROM specialists ORDER BY id LIMIT 5000")
+            self.cities = await column("SELECT city FROM specialists GROUP BY city ORDER BY count(*) DESC LIMIT 5")
+            self.categories = await column("SELECT slug FROM categories ORDER BY slug")
+            self.locations = (await conn.execute(text(
+                "SELECT latitude, longitude FROM specialists WHERE latitude IS NOT NULL ORDER BY id LIMIT 500"
+            ))).all()
+            # Accounts with the longest order histories
+            self.clients = await column(
+                "SELECT client_id FROM orders GROUP BY client_id ORDER BY count(*) DESC, client_id LIMIT 20"
+            )
+            self.specialist_users = await column(
+                "SELECT user_id FROM specialists ORDER BY completed_orders DESC, id LIMIT 20"
+            )
+            self.emails = await column("SELECT email FROM users WHERE email LIKE 'client%' ORDER BY email LIMIT 50")
+            self.dataset = {
+                table: (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar() for table in TABLES
+            }
+        if not self.specialists or not self.clients:
+            raise SystemExit("The database is empty: run python -m benchmarks.datagen --reset first")
+
+
+def _auth(user_id: str) -> dict:
+    return {"headers": {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}}
+
+
+def scenarios(s: Samples) -> Dict[str, Callable[[random.Random], Request]]:
+    def near(rng):
+        lat, lon = rng.choice(s.locations)
+        return "GET", "/api/v1/specialists", {"params": {"lat": lat, "lon": lon, "radius_km": 5}}
+
+    return {
+        "specialists.list": lambda rng: ("GET", "/api/v1/specialists", {"params": {"page": rng.randint(1, 5)}}),
+        "specialists.list_city": lambda rng: ("GET", "/api/v1/specialists", {"params": {"city": rng.choice(s.cities)}}),
+        "specialists.list_category_price": lambda rng: (
+            "GET", "/api/v1/specialists", {"params": {"category": rng.choice(s.categories), "sort_by": "price"}}
+        ),
+        "specialists.search": lambda rng: ("GET", "/api/v1/specialists", {"params": {"search": rng.choice(SEARCH_TERMS)}}),
+        "specialists.near": near,
+        "specialists.facets": lambda rng: ("GET", "/api/v1/specialists/facets", {"params": {"city": rng.choice(s.cities)}}),
+        "specialists.profile": lambda rng: ("GET", f"/api/v1/specialists/{rng.choice(s.specialists)}", {}),
+        "reviews.specialist": lambda rng: ("GET", f"/api/v1/reviews/specialist/{rng.choice(s.specialists)}", {}),
+        "reviews.specialist_low": lambda rng: (
+            "GET", f"/api/v1/reviews/specialist/{rng.choice(s.specialists)}", {"params": {"max_rating": 2}}
+        ),
+        "orders.client": lambda rng: ("GET", "/api/v1/orders", _auth(rng.choice(s.clients))),
+        "orders.specialist": lambda rng: ("GET", "/api/v1/orders/specialist", _auth(rng.choice(s.specialist_users))),
+        "auth.login": lambda rng: (
+            "POST", "/api/v1/auth/login", {"json": {"email": rng.choice(s.emails), "password": PASSWORD}}
+        ),
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    # Nearest rank on sorted values
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        for e in [engine] + replicas.engines:
+            event.listen(e.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+async def run_scenario(client: httpx.AsyncClient, make: Callable, rng: random.Random, counter: QueryCounter,
+                       requests: int, warmup: int) -> dict:
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + requests):
+        method, url, kwargs = make(rng)
+        before = counter.count
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        if i < warmup:
+            continue
+        if response.status_code >= 400:
+            errors += 1
+        latencies.append(elapsed)
+        queries.append(counter.count - before)
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def benchmark(requests: int, warmup: int, seed: int, only: Optional[List[str]]) -> dict:
+    rng = random.Random(seed)
+    async with app.router.lifespan_context(app):
+        samples = Samples()
+        await samples.load()
+        counter = QueryCounter()
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, make in scenarios(samples).items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                # Login is bcrypt-bound: fewer rounds tell the same story
+                n = max(10, requests // 10) if name == "auth.login" else requests
+                results[name] = await run_scenario(client, make, rng, counter, n, warmup)
+                print(f"{name:<34}{results[name]['p50_ms']:>9.2f}{results[name]['p95_ms']:>9.2f}"
+                      f"{results[name]['p99_ms']:>9.2f}{results[name]['queries_per_request']:>9.1f}")
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "seed": seed,
+            "requests": requests,
+            "warmup": warmup,
+            "dataset": samples.dataset,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    if report["meta"]["dataset"] != baseline["meta"]["dataset"]:
+        print("warning: the datasets differ, numbers are not directly comparable")
+    print(f"\n{'vs ' + str(baseline['meta'].get('git_commit')):<34}{'p50':>16}{'p95':>16}{'p99':>16}{'queries':>10}")
+    for name, new in report["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{new[key]:>8.2f} {change:>+6.0f}%")
+        print(f"{name:<34}" + "".join(f"{c:>16}" for c in cells)
+              + f"{old['queries_per_request']:>4.0f}→{new['queries_per_request']:<4.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes, e.g. specialists orders")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<34}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    report = asyncio.run(benchmark(args.requests, args.warmup, args.seed, args.only))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
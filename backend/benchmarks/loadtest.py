@@ -0,0 +1,320 @@
+"""Open-loop load test of a running API with a production-like traffic mix.
+
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.loadtest --url http://localhost:8000 --rates 50,100,200,400 --duration 30 \
+        --out curve.json --csv curve.csv
+
+Each step offers a fixed arrival rate (Poisson arrivals) for --duration
+seconds, whether or not earlier requests have completed, so a saturated
+server shows up as growing latency instead of a slower client. Latency
+is measured from the scheduled arrival time (no coordinated omission).
+The steps form a throughput-vs-latency curve; the first step that misses
+the SLO or falls behind the offered rate is reported as saturation.
+
+Accounts come from benchmarks.datagen (clientN@example.com). With
+--read-only no orders are created.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.datagen import PASSWORD
+
+API = "/api/v1"
+
+# Share of arrivals per action
+MIXES: Dict[str, Dict[str, float]] = {
+    "default": {"browse": 70, "profile": 15, "orders": 10, "auth": 5},
+    "browse": {"browse": 100},
+    "writes": {"browse": 50, "profile": 10, "orders": 35, "auth": 5},
+}
+SEARCH_TERMS = ["сантехника", "ремонт", "маникюр", "английский", "уборка", "мастер"]
+
+
+class Histogram:
+    """Log-bucketed latency histogram: 20 buckets per decade, 0.1 ms to 100 s."""
+
+    PER_DECADE = 20
+    LOWEST = 0.1
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.max = 0.0
+
+    def record(self, ms: float) -> None:
+        bucket = max(0, math.ceil(math.log10(max(ms, self.LOWEST) / self.LOWEST) * self.PER_DECADE))
+        self.counts[bucket] += 1
+        self.total += 1
+        self.max = max(self.max, ms)
+
+    def upper_bound(self, bucket: int) -> float:
+        return self.LOWEST * 10 ** (bucket / self.PER_DECADE)
+
+    def percentile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        rank = math.ceil(q / 100 * self.total)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {f"{self.upper_bound(b):.3f}": n for b, n in sorted(self.counts.items())}
+
+
+class Target:
+    """Ids, tokens and services sampled from the target through its API."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, read_only: bool):
+        self.client = client
+        self.rng = rng
+        self.read_only = read_only
+
+    async def load(self, accounts: int) -> None:
+        self.specialists: List[str] = []
+        self.cities = set()
+        for page in range(1, 6):
+            response = await self.client.get(f"{API}/specialists", params={"page": page, "per_page": 100, "count": "none"})
+            response.raise_for_status()
+            for item in response.json()["items"]:
+                self.specialists.append(item["id"])
+                self.cities.add(item["city"])
+        if not self.specialists:
+            raise SystemExit("No specialists on the target: run python -m benchmarks.datagen --reset first")
+        self.cities = sorted(self.cities)
+        self.categories = [c["slug"] for c in (await self.client.get(f"{API}/categories")).json()]
+
+        # (specialist_id, service_id) pairs to order from
+        self.services = []
+        for specialist_id in self.rng.sample(self.specialists, min(50, len(self.specialists))):
+            for service in (await self.client.get(f"{API}/services/specialist/{specialist_id}")).json():
+                self.services.append((specialist_id, service["id"]))
+
+        self.emails = [f"client{i}@example.com" for i in range(accounts)]
+        self.tokens = []
+        for email in self.emails[:20]:
+            response = await self.client.post(f"{API}/auth/login", json={"email": email, "password": PASSWORD})
+            if response.status_code == 200:
+                self.tokens.append(response.json()["access_token"])
+        if not self.tokens:
+            raise SystemExit(f"Could not sign in as {self.emails[0]}: was the dataset made by benchmarks.datagen?")
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+
+# Actions: one user interaction, possibly several requests
+
+async def browse(t: Target) -> List[httpx.Response]:
+    rng = t.rng
+    params = rng.choice([
+        {},
+        {"city": rng.choice(t.cities)},
+        {"category": rng.choice(t.categories), "sort_by": "price"} if t.categories else {},
+        {"search": rng.choice(SEARCH_TERMS)},
+        {"page": rng.randint(2, 5)},
+    ])
+    return [await t.client.get(f"{API}/specialists", params=params)]
+
+
+async def profile(t: Target) -> List[httpx.Response]:
+    # A profile page loads the profile and its reviews side by side
+    specialist_id = t.rng.choice(t.specialists)
+    return list(await asyncio.gather(
+        t.client.get(f"{API}/specialists/{specialist_id}"),
+        t.client.get(f"{API}/reviews/specialist/{specialist_id}"),
+    ))
+
+
+async def orders(t: Target) -> List[httpx.Response]:
+    if t.read_only or not t.services or t.rng.random() < 0.7:
+        return [await t.client.get(f"{API}/orders", headers=t.auth())]
+    specialist_id, service_id = t.rng.choice(t.services)
+    return [await t.client.post(
+        f"{API}/orders", headers=t.auth(),
+        json={"specialist_id": specialist_id, "service_id": service_id, "description": "Нагрузочный тест"},
+    )]
+
+
+async def auth(t: Target) -> List[httpx.Response]:
+    email = t.rng.choice(t.emails)
+    return [await t.client.post(f"{API}/auth/login", json={"email": email, "password": PASSWORD})]
+
+
+ACTIONS: Dict[str, Callable[[Target], Awaitable[List[httpx.Response]]]] = {
+    "browse": browse, "profile": profile, "orders": orders, "auth": auth,
+}
+
+
+class Step:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.latency = Histogram()
+        self.per_action: Dict[str, Histogram] = {name: Histogram() for name in ACTIONS}
+        self.errors: Counter = Counter()
+        self.completed = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+
+    def summary(self) -> dict:
+        return {
+            "offered_rps": self.rate,
+            "achieved_rps": round(self.completed / self.elapsed, 2) if self.elapsed else 0.0,
+            "completed": self.completed,
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.errors),
+            "dropped": self.dropped,
+            **{f"p{q}_ms": round(self.latency.percentile(q), 2) for q in (50, 90, 95, 99)},
+            "max_ms": round(self.latency.max, 2),
+            "actions": {
+                name: {"count": h.total, "p50_ms": round(h.percentile(50), 2), "p99_ms": round(h.percentile(99), 2)}
+                for name, h in self.per_action.items() if h.total
+            },
+            "histogram": self.latency.to_dict(),
+        }
+
+
+async def run_step(target: Target, mix: Dict[str, float], rate: float, duration: float, max_in_flight: int) -> Step:
+    step = Step(rate)
+    names, weights = zip(*mix.items())
+    in_flight = set()
+    rng = target.rng
+
+    async def arrival(name: str, scheduled: float) -> None:
+        try:
+            responses = await ACTIONS[name](target)
+            for response in responses:
+                if response.status_code >= 400:
+                    step.errors[str(response.status_code)] += 1
+        except httpx.HTTPError as e:
+            step.errors[type(e).__name__] += 1
+        ms = (time.perf_counter() - scheduled) * 1000
+        step.latency.record(ms)
+        step.per_action[name].record(ms)
+        step.completed += 1
+
+    started = time.perf_counter()
+    next_at = started
+    while next_at < started + duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            step.dropped += 1
+        else:
+            task = asyncio.create_task(arrival(rng.choices(names, weights)[0], next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_at += rng.expovariate(rate)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    step.elapsed = time.perf_counter() - started
+    return step
+
+
+def saturated(summary: dict, slo_ms: float) -> Optional[str]:
+    if summary["p99_ms"] > slo_ms:
+        return f"p99 {summary['p99_ms']:.0f} ms over the {slo_ms:.0f} ms SLO"
+    if summary["achieved_rps"] < 0.9 * summary["offered_rps"]:
+        return "throughput fell behind the offered rate"
+    if summary["dropped"] or summary["errors"] > 0.01 * max(summary["completed"], 1):
+        return "errors or dropped arrivals"
+    return None
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action {name!r}, expected one of {', '.join(ACTIONS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+async def main_async(args) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        target = Target(client, rng, args.read_only)
+        await target.load(args.accounts)
+
+        if args.warmup:
+            await run_step(target, args.mix, args.rates[0], args.warmup, args.max_in_flight)
+
+        steps, saturation = [], None
+        print(f"{'offered':>8}{'achieved':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}{'dropped':>9}")
+        for rate in args.rates:
+            summary = (await run_step(target, args.mix, rate, args.duration, args.max_in_flight)).summary()
+            steps.append(summary)
+            print(f"{rate:>8.0f}{summary['achieved_rps']:>10.1f}{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                  f"{summary['p99_ms']:>9.1f}{summary['errors']:>8}{summary['dropped']:>9}")
+            reason = saturated(summary, args.slo_ms)
+            if reason and saturation is None:
+                saturation = {"offered_rps": rate, "reason": reason}
+                if args.stop_at_saturation:
+                    break
+
+    if saturation:
+        print(f"saturation at {saturation['offered_rps']:.0f} req/s: {saturation['reason']}", file=sys.stderr)
+    else:
+        print("no saturation within the tested rates", file=sys.stderr)
+    return {
+        "url": args.url,
+        "mix": args.mix,
+        "duration_s": args.duration,
+        "slo_p99_ms": args.slo_ms,
+        "saturation": saturation,
+        "steps": steps,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--mix", type=parse_mix, default="default",
+                        help=f"one of {', '.join(MIXES)} or weights like browse=70,profile=15,orders=10,auth=5")
+    parser.add_argument("--rates", type=lambda v: [float(r) for r in v.split(",")], default=[25, 50, 100, 200],
+                        help="arrival rates in actions per second, one step each")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per step")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds at the first rate, not recorded")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--slo-ms", type=float, default=500, help="p99 latency objective")
+    parser.add_argument("--stop-at-saturation", action="store_true")
+    parser.add_argument("--accounts", type=int, default=1000, help="clientN@example.com accounts to sign in as")
+    parser.add_argument("--read-only", action="store_true", help="never create orders")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="JSON report with histograms")
+    parser.add_argument("--csv", help="throughput-vs-latency curve as CSV")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.csv:
+        columns = ["offered_rps", "achieved_rps", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms", "errors", "dropped"]
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(report["steps"])
+
+
+if __name__ == "__main__":
+    main()
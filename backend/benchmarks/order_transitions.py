@@ -0,0 +1,198 @@
+"""Concurrency check of the order state machine against a real database.
+
+    python -m benchmarks.datagen --reset     # once
+    python -m benchmarks.order_transitions --orders 200 --copies 3
+
+Creates --orders fresh orders, then for every order fires --copies
+accept, complete and cancel requests at once, in random order, through
+the whole app over the ASGI transport. Each request runs in its own
+session and connection, so they race in the database. Afterwards it
+checks that:
+
+- every transition succeeded at most once per order, and complete and
+  cancel never both did;
+- the final status and payment status match the transitions that won;
+- the specialist's completed_orders grew by exactly the completions.
+
+The orders are deleted again at the end. Exits with status 1 on any
+violation.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import select, delete, update
+
+from app.core.security import create_access_token
+from app.crud.counters import run_fold
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models import Order, OrderStatus, PaymentStatus, Service, Specialist, User, UserRole
+
+API = "/api/v1/orders"
+ACTIONS = ["accept", "complete", "cancel"]
+
+
+def _auth(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+async def _pick_accounts():
+    async with AsyncSessionLocal() as db:
+        service = (await db.execute(
+            select(Service.id, Service.specialist_id, Specialist.user_id)
+            .join(Specialist, Specialist.id == Service.specialist_id)
+            .order_by(Service.id)
+            .limit(1)
+        )).first()
+        client_id = (await db.execute(
+            select(User.id).where(User.role == UserRole.CLIENT).order_by(User.id).limit(1)
+        )).scalar_one_or_none()
+    if service is None or client_id is None:
+        raise SystemExit("The database is empty: run python -m benchmarks.datagen --reset first")
+    return service, client_id
+
+
+async def _completed_orders(specialist_id: str) -> int:
+    # Fold pending deltas first so that the counter is current
+    while await run_fold():
+        pass
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(Specialist.completed_orders).where(Specialist.id == specialist_id)
+        )).scalar_one()
+
+
+async def run(orders: int, copies: int, parallel: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    service, client_id = await _pick_accounts()
+    headers = {"client": _auth(client_id), "specialist": _auth(service.user_id)}
+    before = await _completed_orders(service.specialist_id)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        created = await asyncio.gather(*[
+            client.post(API, headers=headers["client"], json={
+                "specialist_id": service.specialist_id, "service_id": service.id,
+            })
+            for _ in range(orders)
+        ])
+        order_ids = [response.json()["id"] for response in created if response.status_code == 200]
+        if len(order_ids) != orders:
+            raise SystemExit(f"only {len(order_ids)} of {orders} orders were created")
+
+        async def fire(order_id: str, action: str):
+            # A little jitter so that every interleaving shows up
+            await asyncio.sleep(rng.random() * 0.005)
+            who = "specialist" if action == "accept" else "client"
+            response = await client.post(f"{API}/{order_id}/{action}", headers=headers[who])
+            return order_id, action, response.status_code
+
+        # All requests for one order race each other; a few orders at a
+        # time keep the connection pool from timing out
+        slots = asyncio.Semaphore(parallel)
+
+        async def hammer(order_id: str):
+            calls = [action for action in ACTIONS for _ in range(copies)]
+            rng.shuffle(calls)
+            async with slots:
+                return await asyncio.gather(*[fire(order_id, action) for action in calls])
+
+        started = time.perf_counter()
+        outcomes = [o for batch in await asyncio.gather(*[hammer(i) for i in order_ids]) for o in batch]
+        elapsed = time.perf_counter() - started
+
+    won: Dict[str, Counter] = {order_id: Counter() for order_id in order_ids}
+    statuses = Counter()
+    for order_id, action, status_code in outcomes:
+        statuses[status_code] += 1
+        if status_code == 200:
+            won[order_id][action] += 1
+
+    async with AsyncSessionLocal() as db:
+        final = {
+            row.id: row for row in (await db.execute(
+                select(Order.id, Order.status, Order.payment_status, Order.completed_at)
+                .where(Order.id.in_(order_ids))
+            )).all()
+        }
+
+    errors = []
+    if any(code >= 500 for code in statuses):
+        errors.append(f"server errors: {dict(statuses)}")
+    for order_id, wins in won.items():
+        row = final[order_id]
+        if any(n > 1 for n in wins.values()):
+            errors.append(f"{order_id}: a transition succeeded twice {dict(wins)}")
+        if wins["complete"] and wins["cancel"]:
+            errors.append(f"{order_id}: both completed and cancelled")
+        if wins["complete"] and not wins["accept"]:
+            errors.append(f"{order_id}: completed without being accepted")
+        if wins["complete"]:
+            expected = (OrderStatus.COMPLETED, PaymentStatus.RELEASED)
+        elif wins["cancel"]:
+            expected = (OrderStatus.CANCELLED, PaymentStatus.REFUNDED)
+        elif wins["accept"]:
+            expected = (OrderStatus.ACCEPTED, PaymentStatus.PENDING)
+        else:
+            expected = (OrderStatus.PENDING, PaymentStatus.PENDING)
+        if (row.status, row.payment_status) != expected:
+            errors.append(f"{order_id}: {row.status.value}/{row.payment_status.value}, "
+                          f"expected {expected[0].value}/{expected[1].value} after {dict(wins)}")
+        if (row.status == OrderStatus.COMPLETED) != (row.completed_at is not None):
+            errors.append(f"{order_id}: completed_at does not match status {row.status.value}")
+
+    completions = sum(wins["complete"] for wins in won.values())
+    after = await _completed_orders(service.specialist_id)
+    if after - before != completions:
+        errors.append(f"completed_orders moved by {after - before}, expected {completions}")
+
+    outcome = Counter(final[order_id].status.value for order_id in order_ids)
+    print(f"{len(outcomes)} transition requests on {orders} orders in {elapsed:.2f} s")
+    print(f"responses: {dict(sorted(statuses.items()))}")
+    print(f"final statuses: {dict(outcome)}")
+
+    # Clean up: drop the orders and take their completions back out
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await db.execute(
+            update(Specialist)
+            .where(Specialist.id == service.specialist_id)
+            .values(completed_orders=Specialist.completed_orders - completions)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return errors
+
+
+async def main_async(args) -> List[str]:
+    try:
+        return await run(args.orders, args.copies, args.parallel, args.seed)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--copies", type=int, default=3, help="concurrent requests per order and transition")
+    parser.add_argument("--parallel", type=int, default=4, help="orders hammered at the same time")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    errors = asyncio.run(main_async(args))
+    for error in errors[:50]:
+        print(f"FAIL {error}", file=sys.stderr)
+    if errors:
+        print(f"{len(errors)} violations", file=sys.stderr)
+        sys.exit(1)
+    print("ok: no violations")
+
+
+if __name__ == "__main__":
+    main()
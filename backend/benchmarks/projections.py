@@ -0,0 +1,115 @@
+"""ORM + Pydantic list path vs. column projection, in rows/sec.
+
+Runs against an in-memory SQLite database, so it measures the Python side
+of a list endpoint (hydration, validation, encoding) rather than Postgres:
+
+    python -m benchmarks.projections --rows 20000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.encoding import dumps
+from app.crud.projections import ORDER, REVIEW, review_select
+from app.db.base import Base
+from app.models import Order, OrderStatus, PaymentStatus, Review, User, UserRole
+from app.schemas.order import OrderResponse
+from app.schemas.review import ReviewResponse
+
+TABLES = [User.__table__, Order.__table__, Review.__table__]
+
+
+def _seed(session: Session, rows: int) -> None:
+    now = datetime(2024, 1, 1)
+    users = [
+        User(id=f"u{i}", email=f"u{i}@example.com", password_hash="x", name=f"Пользователь {i}", role=UserRole.CLIENT)
+        for i in range(100)
+    ]
+    session.add_all(users)
+    for i in range(rows):
+        session.add(Order(
+            id=f"o{i}", client_id=f"u{i % 100}", specialist_id="s0", service_id="sv0",
+            description="Починить кран", address="Москва", total_price=1500.0,
+            specialist_price=1275.0, platform_fee=225.0, status=OrderStatus.COMPLETED,
+            payment_status=PaymentStatus.RELEASED, created_at=now + timedelta(minutes=i),
+        ))
+        session.add(Review(
+            id=f"r{i}", order_id=f"o{i}", user_id=f"u{i % 100}", specialist_id="s0",
+            rating=5, comment="Отлично", is_published=True, created_at=now + timedelta(minutes=i),
+        ))
+    session.commit()
+
+
+def _orm_orders(session: Session) -> bytes:
+    orders = session.execute(select(Order).order_by(Order.created_at.desc())).scalars().all()
+    models = [OrderResponse.model_validate(o) for o in orders]
+    # What FastAPI does with a response_model: dump, validate again, encode
+    adapter = TypeAdapter(List[OrderResponse])
+    return adapter.dump_json(adapter.validate_python([m.model_dump() for m in models]))
+
+
+def _projected_orders(session: Session) -> bytes:
+    rows = session.execute(ORDER.select().order_by(Order.created_at.desc())).all()
+    return dumps(ORDER.to_dicts(rows))
+
+
+def _orm_reviews(session: Session) -> bytes:
+    reviews = session.execute(
+        select(Review).options(selectinload(Review.user)).order_by(Review.created_at.desc())
+    ).scalars().all()
+    models = [
+        ReviewResponse(
+            id=r.id, order_id=r.order_id, user_id=r.user_id, specialist_id=r.specialist_id,
+            rating=r.rating, comment=r.comment, pros=r.pros, cons=r.cons, response=r.response,
+            is_published=r.is_published, created_at=r.created_at,
+            user_name=r.user.name if r.user else None,
+            user_avatar=r.user.avatar if r.user else None,
+        ) for r in reviews
+    ]
+    adapter = TypeAdapter(List[ReviewResponse])
+    return adapter.dump_json(adapter.validate_python([m.model_dump() for m in models]))
+
+
+def _projected_reviews(session: Session) -> bytes:
+    rows = session.execute(review_select().order_by(Review.created_at.desc())).all()
+    return dumps(REVIEW.to_dicts(rows))
+
+
+def _rows_per_sec(engine, fn, rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            fn(session)
+            best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=TABLES)
+    with Session(engine) as session:
+        _seed(session, args.rows)
+
+    print(f"{'endpoint':<28}{'orm rows/s':>14}{'projected rows/s':>20}{'speedup':>10}")
+    for name, before, after in [
+        ("get_orders", _orm_orders, _projected_orders),
+        ("get_specialist_reviews", _orm_reviews, _projected_reviews),
+    ]:
+        orm = _rows_per_sec(engine, before, args.rows, args.repeat)
+        projected = _rows_per_sec(engine, after, args.rows, args.repeat)
+        print(f"{name:<28}{orm:>14,.0f}{projected:>20,.0f}{projected / orm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from app.core import cache as cache_module
+from app.core.cache import MISSING, MemoryCache
+
+
+def test_zero_ttl_disables_caching():
+    cache = MemoryCache(ttl=0)
+    cache.set("key", "value")
+    assert cache.get("key") is MISSING
+    assert len(cache) == 0
+
+
+def test_zero_ttl_per_entry_drops_the_cached_value():
+    cache = MemoryCache(ttl=60)
+    cache.set("key", "old")
+    cache.set("key", "new", ttl=0)
+    assert cache.get("key") is MISSING
+
+
+def test_no_ttl_never_expires(monkeypatch):
+    cache = MemoryCache()
+    cache.set("key", "value")
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: float("1e12"))
+    assert cache.get("key") == "value"
+
+
+def test_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = MemoryCache(ttl=30)
+    cache.set("key", "value")
+    now[0] += 29
+    assert cache.get("key") == "value"
+    now[0] += 2
+    assert cache.get("key") is MISSING
+
+
+def test_lru_eviction_by_size():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
@@ -119,7 +119,7 @@ echo.
 echo [6/6] 🔧 Перезапуск Backend (порт %BACKEND_PORT%)...
 echo.
 
-ssh %SERVER_USER%@%SERVER_IP% "cd /home/Tema/yodo/backend && pkill -f 'uvicorn' 2>/dev/null; nohup python3 -m uvicorn main:app --host 0.0.0.0 --port %BACKEND_PORT% > backend.log 2>&1 & echo '✅ Backend запущен на порту %BACKEND_PORT%'" 2>nul
+ssh %SERVER_USER%@%SERVER_IP% "cd /home/Tema/yodo/backend && python3 -m alembic upgrade head && { pkill -f 'uvicorn' 2>/dev/null; nohup python3 -m uvicorn main:app --host 0.0.0.0 --port %BACKEND_PORT% > backend.log 2>&1 & echo '✅ Backend запущен на порту %BACKEND_PORT%'; }" 2>nul
 
 if errorlevel 1 (
     echo ⚠️  Backend не запущен (возможно файлов нет на сервере)